@@ -0,0 +1,126 @@
+# asset_cache.py
+"""
+Content-addressed on-disk cache for generated assets.
+
+Blobs are stored under `<root>/<kind>/<ab>/<key><ext>` where `key` is the
+SHA-256 of everything the asset depends on. Entries are written with
+write-then-rename so several worker processes can share one cache, and a hit
+refreshes the file's mtime, which `evict()` uses as the LRU clock.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from typing import Dict, Optional, Tuple
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents, streamed in 1 MiB chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def mesh_key(font_hash: str, glyph_index: int, char_size: int,
+             extrude_depth: float, export_format: str, **options) -> str:
+    """`options` holds any further mesh settings (e.g. flattening tolerance)."""
+    return cache_key("mesh", font=font_hash, glyph=glyph_index, size=char_size,
+                     depth=extrude_depth, format=export_format, **options)
+
+
+def audio_key(text: str, voice: str, engine: str) -> str:
+    return cache_key("audio", text=text, voice=voice, engine=engine)
+
+
+def cache_key(kind: str, **parts) -> str:
+    blob = json.dumps({"kind": kind, **parts}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class AssetCache:
+    """Size-bounded LRU cache of asset files keyed by content hash."""
+
+    def __init__(self, root: str = ".cache", max_bytes: int = 2 << 30):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    def _path(self, kind: str, key: str, ext: str) -> str:
+        return os.path.join(self.root, kind, key[:2], key + ext)
+
+    def record(self, kind: str, hit: bool):
+        counter = self.hits if hit else self.misses
+        counter[kind] = counter.get(kind, 0) + 1
+
+    def fetch(self, kind: str, key: str, dest: str) -> bool:
+        """Copy a cached blob to `dest`; returns False on a miss."""
+        src = self._path(kind, key, os.path.splitext(dest)[1])
+        try:
+            os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+            shutil.copyfile(src, dest)
+            os.utime(src)  # mark as recently used
+        except FileNotFoundError:
+            self.record(kind, False)
+            return False
+        self.record(kind, True)
+        return True
+
+    def lookup(self, kind: str, key: str, ext: str) -> Optional[str]:
+        """Path of a cached blob to read in place, or None on a miss."""
+        path = self._path(kind, key, ext)
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            self.record(kind, False)
+            return None
+        self.record(kind, True)
+        return path
+
+    def store(self, kind: str, key: str, src: str):
+        dest = self._path(kind, key, os.path.splitext(src)[1])
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f"{dest}.{os.getpid()}.tmp"
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dest)
+
+    def store_bytes(self, kind: str, key: str, ext: str, data: bytes):
+        dest = self._path(kind, key, ext)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f"{dest}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, dest)
+
+    def evict(self, max_bytes: Optional[int] = None) -> Tuple[int, int]:
+        """Delete least recently used blobs until the cache fits.
+
+        Returns (files removed, bytes freed).
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                st = os.stat(path)
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        removed = freed = 0
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+            freed += size
+        return removed, freed
+
+    def report(self) -> str:
+        kinds = sorted(set(self.hits) | set(self.misses))
+        parts = [f"{kind} {self.hits.get(kind, 0)} hit / {self.misses.get(kind, 0)} miss"
+                 for kind in kinds]
+        return "cache    " + (", ".join(parts) if parts else "unused")
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# audio_post.py
+"""
+Post-processing for TTS output: decode, trim silence, normalise loudness and
+re-encode.
+
+edge_tts and gTTS return MP3 whatever the file is called; soundfile
+(libsndfile >= 1.1) recognises it by content and writes Ogg Vorbis, Ogg/Opus
+and PCM WAV, so no ffmpeg is needed. Vorbis is the default because Unity's
+audio importer reads Ogg Vorbis but not Ogg/Opus; opus is smaller at speech
+bitrates and fine for other consumers.
+
+Lossy output is written at `compression_level` 0.9 (soundfile: 0 = best
+quality, 1 = smallest). At libsndfile's default, Vorbis came out larger
+than the ~48 kbps MP3 it replaces. At 0.9, the `--sample 10` clips (about
+one second of speech-like sound each) come out 12% smaller as Vorbis and
+57% smaller as Opus. Each Vorbis file carries a ~4 kB codebook header, so
+longer clips gain more and sub-second ones less.
+
+Trimming drops leading and trailing 10 ms frames more than `silence_db`
+below the loudest frame, keeping `pad` seconds on either side. Loudness is
+normalised on the RMS of what is left (a speech-level approximation, not
+full ITU-R BS.1770 weighting), with the gain capped so the peak stays
+below `peak_db`.
+
+Usage examples
+--------------
+# Process the raw TTS files of a build
+python audio_post.py --indir audio/raw --outdir audio --format vorbis --jobs 8
+
+# Offline: generate speech-like MP3 sample audio first
+python audio_post.py --sample 50 --outdir audio_post_demo --format opus
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import soundfile as sf
+
+# --format -> (container, codec, extension)
+FORMATS = {
+    "opus": ("OGG", "OPUS", ".ogg"),
+    "vorbis": ("OGG", "VORBIS", ".ogg"),
+    "wav": ("WAV", "PCM_16", ".wav"),
+}
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+FRAME_SECONDS = 0.01
+
+
+@dataclass(frozen=True)
+class PostSettings:
+    format: str = "vorbis"
+    silence_db: float = 40.0  # frames this far below the loudest frame count as silence
+    pad: float = 0.05         # seconds of silence kept before and after speech
+    target_db: float = -20.0  # RMS level of the trimmed clip, dBFS
+    peak_db: float = -1.0     # gain is capped so peaks stay below this, dBFS
+    compression_level: float = 0.9  # lossy formats: 0 = best quality, 1 = smallest
+
+    @property
+    def extension(self) -> str:
+        return FORMATS[self.format][2]
+
+
+@dataclass
+class PostResult:
+    src: str
+    dest: str
+    ok: bool
+    in_bytes: int = 0
+    out_bytes: int = 0
+    in_seconds: float = 0.0
+    out_seconds: float = 0.0
+    seconds: float = 0.0  # processing time
+    error: Optional[str] = None
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int, silence_db: float = 40.0,
+                 pad: float = 0.05) -> np.ndarray:
+    frame = max(1, int(sample_rate * FRAME_SECONDS))
+    n = len(samples) // frame
+    if n == 0:
+        return samples
+    rms = np.sqrt(np.mean(samples[:n * frame].reshape(n, frame) ** 2, axis=1))
+    level = 20 * np.log10(rms + 1e-12)
+    loud = np.flatnonzero(level > level.max() - silence_db)
+    keep = int(pad * sample_rate)
+    start = max(0, loud[0] * frame - keep)
+    end = min(len(samples), (loud[-1] + 1) * frame + keep)
+    return samples[start:end]
+
+
+def normalize(samples: np.ndarray, target_db: float = -20.0,
+              peak_db: float = -1.0) -> np.ndarray:
+    rms = np.sqrt(np.mean(samples ** 2)) if len(samples) else 0.0
+    peak = np.abs(samples).max() if len(samples) else 0.0
+    if rms <= 1e-9:
+        return samples
+    gain = min(10 ** (target_db / 20) / rms, 10 ** (peak_db / 20) / peak)
+    return samples * gain
+
+
+def resample(samples: np.ndarray, sample_rate: int, target_rate: int) -> np.ndarray:
+    """Linear-interpolation resampling (only used to reach an Opus-legal rate)."""
+    if sample_rate == target_rate or len(samples) == 0:
+        return samples
+    n = int(round(len(samples) * target_rate / sample_rate))
+    return np.interp(np.arange(n) * (sample_rate / target_rate),
+                     np.arange(len(samples)), samples)
+
+
+def process_file(src: str, dest: str, settings: PostSettings = PostSettings()) -> PostResult:
+    """Decode `src`, trim and normalise it and write `dest`. Safe to run in a worker."""
+    start = time.perf_counter()
+    try:
+        in_bytes = os.path.getsize(src)
+        data, sample_rate = sf.read(src, dtype="float64", always_2d=True)
+        samples = data.mean(axis=1)  # speech: mono is enough
+        in_seconds = len(samples) / sample_rate
+
+        samples = trim_silence(samples, sample_rate, settings.silence_db, settings.pad)
+        samples = normalize(samples, settings.target_db, settings.peak_db)
+        container, codec, _ = FORMATS[settings.format]
+        if codec == "OPUS" and sample_rate not in OPUS_RATES:
+            target = next((r for r in OPUS_RATES if r >= sample_rate), OPUS_RATES[-1])
+            samples, sample_rate = resample(samples, sample_rate, target), target
+
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        part_path = f"{dest}.part"
+        lossy = {} if codec == "PCM_16" else {"compression_level": settings.compression_level}
+        sf.write(part_path, samples.astype(np.float32), sample_rate,
+                 format=container, subtype=codec, **lossy)
+        os.replace(part_path, dest)
+        return PostResult(src, dest, True, in_bytes, os.path.getsize(dest),
+                          in_seconds, len(samples) / sample_rate, time.perf_counter() - start)
+    except Exception as e:
+        return PostResult(src, dest, False, seconds=time.perf_counter() - start,
+                          error=f"{type(e).__name__}: {e}")
+
+
+def savings_report(results) -> str:
+    ok = [r for r in results if r.ok]
+    in_bytes = sum(r.in_bytes for r in ok)
+    out_bytes = sum(r.out_bytes for r in ok)
+    in_seconds = sum(r.in_seconds for r in ok)
+    out_seconds = sum(r.out_seconds for r in ok)
+    return (f"{len(ok)} files: {in_bytes / 1e6:.2f} MB -> {out_bytes / 1e6:.2f} MB "
+            f"({_change(in_bytes, out_bytes)}), "
+            f"{in_seconds:.1f}s -> {out_seconds:.1f}s of audio ({_change(in_seconds, out_seconds)})")
+
+
+def _change(before, after) -> str:
+    return f"{100 * (after / before - 1):+.0f}%" if before else "n/a"
+
+
+def make_samples(count: int, outdir: str, as_mp3: bool = True, sample_rate: int = 24000):
+    """Offline stand-in for TTS output, written like edge_tts returns it.
+
+    Each clip is a voiced syllable (a harmonic tone with a pitch glide and
+    breath noise) between 0.15 s and 0.3 s of silence, saved as 24 kHz mono
+    MP3 at about 48 kbps constant bitrate. A plain sine encodes to far fewer
+    bits than speech and would make every codec look better than it is.
+    """
+    rng = np.random.default_rng(0)
+    os.makedirs(outdir, exist_ok=True)
+    paths = []
+    for i in range(count):
+        t = np.arange(int((0.4 + 0.02 * (i % 10)) * sample_rate)) / sample_rate
+        pitch = 110 + 10 * (i % 8) + 30 * np.sin(2 * np.pi * 1.5 * t)
+        phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+        voice = sum(np.sin(k * phase) / k for k in range(1, 30)) * np.sin(np.pi * t / t[-1])
+        voice = 0.3 * voice + rng.normal(0, 0.03, len(t)) * np.sin(np.pi * t / t[-1])
+        samples = np.concatenate([np.zeros(int(0.15 * sample_rate)), voice,
+                                  np.zeros(int(0.3 * sample_rate))])
+        samples += rng.normal(0, 0.002, len(samples))  # room noise
+        path = os.path.join(outdir, chr(0x4E00 + i) + (".mp3" if as_mp3 else ".wav"))
+        if as_mp3:
+            sf.write(path, samples, sample_rate, format="MP3", subtype="MPEG_LAYER_III",
+                     compression_level=0.7, bitrate_mode="CONSTANT")
+        else:
+            sf.write(path, samples, sample_rate, format="WAV", subtype="PCM_16")
+        paths.append(path)
+    return paths
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(
+        description="Trim, normalise and re-encode TTS audio in a worker pool.")
+    ap.add_argument("--indir", default="audio/raw",
+                    help="Directory of raw TTS files")
+    ap.add_argument("--outdir", default="audio",
+                    help="Directory for processed files")
+    ap.add_argument("--format", choices=sorted(FORMATS), default="vorbis")
+    ap.add_argument("--silence-db", type=float, default=PostSettings.silence_db,
+                    help="Silence threshold below the loudest frame, dB")
+    ap.add_argument("--target-db", type=float, default=PostSettings.target_db,
+                    help="Target RMS loudness, dBFS")
+    ap.add_argument("--compression-level", type=float, default=PostSettings.compression_level,
+                    help="Vorbis/Opus size vs quality, 0 = best quality, 1 = smallest "
+                         f"(default {PostSettings.compression_level})")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count(),
+                    help="Worker processes (default: all cores)")
+    ap.add_argument("--sample", type=int, metavar="N",
+                    help="Generate N offline sample files into <outdir>/raw and process those")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    settings = PostSettings(format=args.format, silence_db=args.silence_db,
+                            target_db=args.target_db, compression_level=args.compression_level)
+    if args.sample:
+        sources = make_samples(args.sample, os.path.join(args.outdir, "raw"))
+    else:
+        sources = [os.path.join(args.indir, name) for name in sorted(os.listdir(args.indir))
+                   if not name.endswith(".part")]
+    dests = [os.path.join(args.outdir, os.path.splitext(os.path.basename(src))[0]
+                          + settings.extension) for src in sources]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        results = list(pool.map(process_file, sources, dests, [settings] * len(sources)))
+    wall = time.perf_counter() - start
+
+    for r in results:
+        if not r.ok:
+            print(f"❌ {r.src}: {r.error}")
+    print(savings_report(results))
+    print(f"{wall:.2f}s with {args.jobs} workers ({len(results) / wall:.1f} files/s)")
+
+
+if __name__ == "__main__":
+    main()
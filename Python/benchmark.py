@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# benchmark.py
+"""
+Benchmark and profiling runner for the asset pipeline.
+
+Every stage runs on a fixed character corpus, one character at a time, so
+slow glyphs stand out:
+
+  font      opening the FreeType face (GlyphOutlines)
+  decode    outline extraction and Bezier flattening
+  union     contour nesting into shells with holes (nest_contours)
+  extrude   LOD meshes (extrude_lods)
+  export    OBJ files per LOD plus one FBX per character
+  atlas     one .glb atlas for the whole corpus
+  png       raster rendering and PNG encoding (txt-to-png.py)
+  sdf       signed distance field rendering (glyph_sdf.py)
+  database  streamed upserts, then close() (CSV, JSON and binary index)
+
+With --repeat N each measurement keeps its best of N. Results can be written
+as JSON (--json) and compared with an earlier run (--compare), e.g. one
+from the previous commit; stages that got slower than --threshold are
+flagged and make the exit status non-zero.
+
+Usage examples
+--------------
+python benchmark.py --font NotoSansCJKsc-Bold.otf --category "HSK 一级" --json bench/base.json
+python benchmark.py --font NotoSansCJKsc-Bold.otf --category "HSK 一级" --compare bench/base.json
+python benchmark.py --font NotoSansCJKsc-Bold.otf --count 50 --profile prof.out --tracemalloc
+"""
+
+import argparse
+import cProfile
+import importlib.util
+import io
+import json
+import os
+import platform
+import pstats
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+import trimesh
+from PIL import ImageFont
+
+from categories import ALL_CATEGORY, load_categories, select
+from fbx_writer import write_fbx
+from glb_atlas import codepoint_name, write_glb_atlas
+from glyph_lod import DEFAULT_LOD_RATIOS, extrude_lods
+from glyph_outlines import DEFAULT_TOLERANCE, GlyphOutlines
+from glyph_polygons import nest_contours
+from glyph_sdf import render_sdf
+from pinyin_db import PinyinDatabase, tone_number
+from pinyin_resolver import PinyinResolver
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STAGES = ["font", "decode", "union", "extrude", "export", "atlas", "png", "sdf", "database"]
+
+
+def _load_script(filename: str):
+    # Hyphenated scripts cannot be imported by name
+    spec = importlib.util.spec_from_file_location(
+        filename.replace("-", "_")[:-3], os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Timings:
+    """Best-of-N seconds per (stage, character) plus optional peak memory per stage."""
+
+    def __init__(self, trace_memory: bool = False):
+        self.seconds = {stage: {} for stage in STAGES}
+        self.peak_bytes = {}
+        self.trace_memory = trace_memory
+
+    @contextmanager
+    def measure(self, stage: str, char: str = "*"):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        best = self.seconds[stage].get(char)
+        self.seconds[stage][char] = elapsed if best is None else min(best, elapsed)
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            self.peak_bytes[stage] = max(self.peak_bytes.get(stage, 0), peak)
+
+    def summary(self):
+        out = {}
+        for stage, per_char in self.seconds.items():
+            if not per_char:
+                continue
+            values = np.array(list(per_char.values()))
+            worst = max(per_char, key=per_char.get)
+            out[stage] = {
+                "total": float(values.sum()),
+                "count": len(values),
+                "mean": float(values.mean()),
+                "p50": float(np.percentile(values, 50)),
+                "p95": float(np.percentile(values, 95)),
+                "max": float(values.max()),
+                "max_char": worst,
+            }
+            if stage in self.peak_bytes:
+                out[stage]["peak_bytes"] = self.peak_bytes[stage]
+        return out
+
+
+def run(chars, args, timings: Timings, workdir: str):
+    """Run every stage over `chars`; returns per-character mesh sizes."""
+    contours = {}
+    for _ in range(args.repeat):
+        # A fresh face per pass, so decoding is never served from its cache
+        with timings.measure("font"):
+            extractor = GlyphOutlines(args.font)
+        for char in chars:
+            with timings.measure("decode", char):
+                contours[char] = extractor.outline(char).flattened(args.tolerance)
+
+    sizes = {}
+    meshes = {}
+    for char in chars:
+        for _ in range(args.repeat):
+            with timings.measure("union", char):
+                polygons = nest_contours(contours[char])
+        if not polygons:
+            continue
+        for _ in range(args.repeat):
+            with timings.measure("extrude", char):
+                lods = extrude_lods(polygons, args.depth, args.lods)
+        arrays = [(np.asarray(m.vertices), np.asarray(m.vertex_normals), np.asarray(m.faces))
+                  for m, _ in lods]
+        meshes[char] = arrays
+        sizes[char] = {"vertices": len(arrays[0][0]), "triangles": len(arrays[0][2])}
+
+        name = codepoint_name(char)
+        for _ in range(args.repeat):
+            with timings.measure("export", char):
+                for lod, (vertices, normals, faces) in enumerate(arrays):
+                    trimesh.Trimesh(vertices, faces, vertex_normals=normals,
+                                    process=False).export(f"{workdir}/{name}_LOD{lod}.obj")
+                write_fbx(f"{workdir}/{name}.fbx",
+                          [(f"{name}_LOD{lod}", v, f, n) for lod, (v, n, f) in enumerate(arrays)])
+
+    for _ in range(args.repeat):
+        with timings.measure("atlas"):
+            write_glb_atlas(meshes, f"{workdir}/atlas.glb")
+
+    txt_to_png = _load_script("txt-to-png.py")
+    font = ImageFont.truetype(args.font, args.fontsize)
+    for char in chars:
+        for _ in range(args.repeat):
+            with timings.measure("png", char):
+                txt_to_png.render_image(char, font, 32, "#000000", "#FFFFFF").save(
+                    io.BytesIO(), format="PNG")
+        for _ in range(args.repeat):
+            with timings.measure("sdf", char):
+                render_sdf(char, extractor)
+
+    pronunciations = PinyinResolver().resolve(chars)
+    for attempt in range(args.repeat):
+        db = PinyinDatabase(os.path.join(workdir, f"db{attempt}"))
+        for char in chars:
+            default = pronunciations[char].default
+            with timings.measure("database", char):
+                db.upsert(char, pinyin=default, tone=tone_number(default),
+                          readings=[{"pinyin": r.pinyin} for r in pronunciations[char].readings],
+                          mesh=f"glb/{char}.obj", audio=f"audio/{char}.ogg")
+        with timings.measure("database", "*close"):
+            db.close()
+    return sizes
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, threshold):
+    """Print per-stage deltas against a baseline run; returns the regressed stages."""
+    regressed = []
+    base_stages = baseline.get("stages", {})
+    print(f"\nvs {baseline['meta'].get('commit') or 'baseline'} "
+          f"({baseline['meta'].get('chars')} chars):")
+    for stage, now in current["stages"].items():
+        before = base_stages.get(stage)
+        if not before:
+            continue
+        change = now["total"] / before["total"] - 1 if before["total"] else 0.0
+        flag = ""
+        # Sub-millisecond stages are mostly timer noise
+        if change > threshold and now["total"] - before["total"] > 1e-3:
+            flag = "  ⚠️ slower"
+            regressed.append(stage)
+        print(f"  {stage:<9} {before['total'] * 1e3:10.1f} ms -> {now['total'] * 1e3:10.1f} ms"
+              f"  {change:+7.1%}{flag}")
+    return regressed
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(
+        description="Time each pipeline stage per character, with optional profiling.")
+    ap.add_argument("--font", required=True,
+                    help="Path to .ttf or .otf font file that supports Hanzi")
+    ap.add_argument("--category", action="append", default=[],
+                    help=f"Corpus category from categories.txt; repeatable (default: {ALL_CATEGORY})")
+    ap.add_argument("--count", type=int,
+                    help="Only the first N characters of the corpus")
+    ap.add_argument("--repeat", type=int, default=1,
+                    help="Runs per measurement, the best is kept (default 1)")
+    ap.add_argument("--depth", type=float, default=10)
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    ap.add_argument("--lods", type=float, nargs="+", default=list(DEFAULT_LOD_RATIOS))
+    ap.add_argument("--fontsize", type=int, default=128,
+                    help="PNG rendering size (txt-to-png.py default)")
+    ap.add_argument("--top", type=int, default=10,
+                    help="How many of the slowest characters to list")
+    ap.add_argument("--json", metavar="PATH",
+                    help="Write results as JSON")
+    ap.add_argument("--compare", metavar="PATH",
+                    help="Earlier --json result to compare against")
+    ap.add_argument("--threshold", type=float, default=0.10,
+                    help="Slowdown flagged as a regression in --compare (default 0.10 = 10%%)")
+    ap.add_argument("--profile", metavar="PATH",
+                    help="Run under cProfile, dump stats to PATH and print the top functions")
+    ap.add_argument("--tracemalloc", action="store_true",
+                    help="Record peak Python memory per stage (slows everything down)")
+    ap.add_argument("strings", nargs="*",
+                    help="Characters to benchmark instead of a category")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    chars = args.strings or select(load_categories(), args.category or [ALL_CATEGORY])
+    chars = [c for c in chars if len(c) == 1][:args.count]
+
+    timings = Timings(trace_memory=args.tracemalloc)
+    profiler = cProfile.Profile() if args.profile else None
+    if args.tracemalloc:
+        tracemalloc.start()
+    with tempfile.TemporaryDirectory() as workdir:
+        if profiler:
+            profiler.enable()
+        start = time.perf_counter()
+        sizes = run(chars, args, timings, workdir)
+        wall = time.perf_counter() - start
+        if profiler:
+            profiler.disable()
+    if args.tracemalloc:
+        tracemalloc.stop()
+
+    stages = timings.summary()
+    per_char = {}
+    for stage, values in timings.seconds.items():
+        for char, seconds in values.items():
+            if char in sizes or char in chars:
+                per_char.setdefault(char, {"seconds": {}, **sizes.get(char, {})})
+                per_char[char]["seconds"][stage] = seconds
+    for entry in per_char.values():
+        entry["total"] = sum(entry["seconds"].values())
+    slowest = sorted(per_char, key=lambda c: -per_char[c]["total"])[:args.top]
+    largest = sorted(sizes, key=lambda c: -sizes[c]["vertices"])[:args.top]
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "font": os.path.basename(args.font),
+            "chars": len(chars),
+            "repeat": args.repeat,
+            "wall": wall,
+        },
+        "stages": stages,
+        "chars": per_char,
+        "slowest": slowest,
+        "largest": largest,
+    }
+
+    print(f"{len(chars)} characters, best of {args.repeat}, {wall:.2f}s wall")
+    print(f"{'stage':<9} {'total ms':>10} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}  worst"
+          + ("   peak MB" if args.tracemalloc else ""))
+    for stage, s in stages.items():
+        line = (f"{stage:<9} {s['total'] * 1e3:10.1f} {s['mean'] * 1e3:9.3f} "
+                f"{s['p95'] * 1e3:9.3f} {s['max'] * 1e3:9.3f}  {s['max_char']:<6}")
+        if "peak_bytes" in s:
+            line += f" {s['peak_bytes'] / 1e6:8.1f}"
+        print(line)
+    print(f"\nslowest {len(slowest)} characters (ms over all stages / vertices / triangles):")
+    for char in slowest:
+        entry = per_char[char]
+        print(f"  {char}  {entry['total'] * 1e3:8.2f}  {entry.get('vertices', '-'):>6}  "
+              f"{entry.get('triangles', '-'):>6}")
+    print("largest meshes: " + " ".join(f"{c}({sizes[c]['vertices']})" for c in largest))
+
+    if profiler:
+        profiler.dump_stats(args.profile)
+        print(f"\ncProfile (top 20 by cumulative time, full stats in {args.profile}):")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressed = compare(results, json.load(f), args.threshold)
+        if regressed:
+            sys.exit(f"❌ regressions in: {', '.join(regressed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# categories.py
+"""
+Build targets by category.
+
+categories.txt lists the category names in display order. The entries come
+from the app's own category map, Assets/Resources/Text/hanziCategories.json
+(loaded in Unity by HanziCategoryDB): each record's `title.cn` is the
+category name and `hanzi` its entries, a string of single characters (the
+app's format) or a list, which may also hold words.
+
+"一切" (everything) is not in the app file. It starts from what already
+ships, the rows of data/pinyin_database.json, plus EXTRA_ENTRIES, and then
+takes in every category entry, so the default build never drops an asset
+just because no category lists it. `uncovered` names those entries.
+"""
+
+import json
+import os
+from typing import Dict, Iterable, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CATEGORY_NAMES = os.path.join(HERE, "categories.txt")
+CATEGORY_SETS = os.path.join(HERE, "..", "Assets", "Resources", "Text", "hanziCategories.json")
+SHIPPED_ENTRIES = os.path.join(HERE, "data", "pinyin_database.json")
+ALL_CATEGORY = "一切"
+# Words from the former generate_fbx.py list; app categories only hold single characters
+EXTRA_ENTRIES = ["汉字"]
+
+
+def shipped_entries(path: str = SHIPPED_ENTRIES) -> List[str]:
+    """Entries of the existing pinyin database, in row order (empty if there is none)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [row["hanzi"] for row in json.load(f)]
+    except FileNotFoundError:
+        return []
+
+
+def _entries(hanzi) -> List[str]:
+    # "一二三" is three characters; a list keeps each item whole
+    return list(dict.fromkeys(hanzi))
+
+
+def load_categories(names_path: str = CATEGORY_NAMES,
+                    sets_path: str = CATEGORY_SETS,
+                    shipped_path: str = SHIPPED_ENTRIES) -> Dict[str, List[str]]:
+    """Category name -> entries, in categories.txt order (missing sets are empty)."""
+    with open(names_path, encoding="utf-8") as f:
+        names = [line.strip() for line in f if line.strip()]
+    with open(sets_path, encoding="utf-8-sig") as f:  # Unity text asset, saved with a BOM
+        records = json.load(f).values()
+    sets = {record["title"]["cn"]: _entries(record["hanzi"]) for record in records}
+    categories = {name: sets.get(name, []) for name in names}
+    categories.update({name: entries for name, entries in sets.items()
+                       if name not in categories})
+    everything = categories.setdefault(ALL_CATEGORY, [])
+    seen = set(everything)
+    seeded = shipped_entries(shipped_path) + EXTRA_ENTRIES
+    for entry in seeded + [e for name, entries in categories.items()
+                           if name != ALL_CATEGORY for e in entries]:
+        if entry not in seen:
+            everything.append(entry)
+            seen.add(entry)
+    return categories
+
+
+def uncovered(categories: Dict[str, List[str]]) -> List[str]:
+    """Entries of "一切" that no other category lists."""
+    member = memberships(categories)
+    return [entry for entry in categories.get(ALL_CATEGORY, ()) if entry not in member]
+
+
+def select(categories: Dict[str, List[str]], targets: Iterable[str]) -> List[str]:
+    """Entries of every target category, de-duplicated, in first-seen order."""
+    unknown = [t for t in targets if t not in categories]
+    if unknown:
+        raise ValueError(f"unknown categories {', '.join(unknown)}; "
+                         f"choose from {', '.join(categories)}")
+    return list(dict.fromkeys(entry for t in targets for entry in categories[t]))
+
+
+def memberships(categories: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Entry -> the categories it belongs to ("一切" left out)."""
+    member: Dict[str, List[str]] = {}
+    for name, entries in categories.items():
+        if name == ALL_CATEGORY:
+            continue
+        for entry in entries:
+            member.setdefault(entry, []).append(name)
+    return member
@@ -1,29 +1,89 @@
-import bpy
+"""
+Batch OBJ -> FBX conversion inside a single Blender process.
+
+Blender is started once for the whole batch; the file list comes from the
+command line after "--", either as a JSON job file or as two directories:
+
+    blender --background --python convert-fbx.py -- jobs.json
+    blender --background --python convert-fbx.py -- glb fbx
+
+jobs.json: {"global_scale": 100.0, "jobs": [["glb/中.obj", "fbx/中.fbx"], ...]}
+"""
+
+import json
 import os
+import sys
+import time
+
+import bpy
+
+
+def parse_jobs(argv):
+    args = argv[argv.index("--") + 1:] if "--" in argv else []
+    if len(args) == 1:
+        with open(args[0], encoding="utf-8") as f:
+            spec = json.load(f)
+        return spec["jobs"], spec.get("global_scale", 1.0)
+    if len(args) == 2:
+        input_folder, output_folder = args
+        jobs = [
+            (os.path.join(input_folder, name),
+             os.path.join(output_folder, os.path.splitext(name)[0] + ".fbx"))
+            for name in sorted(os.listdir(input_folder))
+            if name.lower().endswith(".obj")
+        ]
+        return jobs, 1.0
+    sys.exit("usage: blender --background --python convert-fbx.py -- (jobs.json | <input_dir> <output_dir>)")
+
+
+# bpy.ops.wm has an attribute for any name, so check the version instead
+NATIVE_OBJ_IMPORT = bpy.app.version >= (3, 2, 0)
+
+
+def import_obj(path):
+    if NATIVE_OBJ_IMPORT:
+        bpy.ops.wm.obj_import(filepath=path)
+    else:
+        bpy.ops.import_scene.obj(filepath=path)
+
 
-# === Enable the built-in OBJ importer ===
-bpy.ops.preferences.addon_enable(module="io_scene_obj")
+def clear_scene():
+    # Remove objects and their mesh data so memory stays flat across the batch
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+    for mesh in list(bpy.data.meshes):
+        bpy.data.meshes.remove(mesh)
 
-# === Set these to absolute paths ===
-input_folder = "C:\\Users\\hanjo\\Hanjo de hanzi\\Python\\glb"
-output_folder = "C:\\Users\\hanjo\\Hanjo de hanzi\\Python\\fbx"
 
-# === Clean the scene ===
-bpy.ops.wm.read_factory_settings(use_empty=True)
+def main():
+    jobs, global_scale = parse_jobs(sys.argv)
 
-# === Iterate over OBJ files ===
-for filename in os.listdir(input_folder):
-    if filename.lower().endswith(".obj"):
-        obj_path = os.path.join(input_folder, filename)
-        fbx_path = os.path.join(output_folder, os.path.splitext(filename)[0] + ".fbx")
+    # === Clean the scene ===
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    if not NATIVE_OBJ_IMPORT:
+        # === Enable the legacy OBJ importer ===
+        bpy.ops.preferences.addon_enable(module="io_scene_obj")
 
-        print(f"Importing {obj_path}")
-        bpy.ops.import_scene.obj(filepath=obj_path)
+    start = time.perf_counter()
+    failed = []
+    for obj_path, fbx_path in jobs:
+        try:
+            clear_scene()
+            import_obj(os.path.abspath(obj_path))
+            os.makedirs(os.path.dirname(os.path.abspath(fbx_path)), exist_ok=True)
+            bpy.ops.export_scene.fbx(filepath=os.path.abspath(fbx_path),
+                                     use_selection=False, global_scale=global_scale)
+            print(f"✓ {fbx_path}")
+        except Exception as e:
+            print(f"❌ {obj_path}: {str(e)}")
+            failed.append(obj_path)
 
-        print(f"Exporting {fbx_path}")
-        bpy.ops.export_scene.fbx(filepath=fbx_path, use_selection=False)
+    # Machine-readable summary for the caller
+    print("FBX_BATCH " + json.dumps({
+        "converted": len(jobs) - len(failed),
+        "failed": failed,
+        "seconds": time.perf_counter() - start,
+    }, ensure_ascii=False))
 
-        # Clean the scene for the next file
-        bpy.ops.object.select_all(action='SELECT')
-        bpy.ops.object.delete()
 
+main()
@@ -1,111 +1,77 @@
-import freetype
 import numpy as np
 import trimesh
-from shapely.geometry import Polygon, MultiPolygon
-from shapely.ops import unary_union
 
 from gtts import gTTS
-from pypinyin import pinyin, Style
 
 import asyncio
 import edge_tts
 
+import io
 import os
-import csv
 import json
+import time
+import sys
+import shlex
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Optional
 
+import audio_post
+import tts_batch
+from asset_cache import AssetCache, audio_key, file_hash, mesh_key
+from build_events import EventLog
+from glyph_outlines import CHAR_SIZE, DEFAULT_TOLERANCE, get_outlines
+from glyph_polygons import nest_contours
+from glb_atlas import codepoint_name, write_glb_atlas
+from fbx_writer import fbx_orientation, write_fbx
+from fbx_convert import convert_direct
+from glyph_lod import DEFAULT_LOD_RATIOS, extrude_lods
+from pinyin_db import ATLAS_FIELDS, PinyinDatabase, tone_number
+from pinyin_resolver import PinyinResolver
+from categories import ALL_CATEGORY, load_categories, memberships, select, uncovered
 
-import pygltflib  # pip install pygltflib
 
 def generate_pronunciation(char, output_dir="audio"):
     tts = gTTS(text=char, lang='zh-cn', slow=False)
     os.makedirs(output_dir, exist_ok=True)
-    filename = f"{output_dir}/{char}.wav"
+    filename = f"{output_dir}/{char}.mp3"  # gTTS returns MP3; see audio_post.py for WAV/Opus
     tts.save(filename)
     print(f"✅ Success: {char} → {filename}")
 
     return filename
 
+MALE_VOICE = tts_batch.DEFAULT_VOICE  # Natural male voice
+
 async def generate_male_voice(char, output_path="audio"):
-    voice = "zh-CN-YunxiNeural"  # Natural male voice
+    voice = MALE_VOICE
     os.makedirs(output_path, exist_ok=True)
     communicate = edge_tts.Communicate(char, voice)
-    await communicate.save(f"{output_path}/{char}.wav")
-    print(f"✅ Success: {char} → {output_path}/{char}.wav")
+    await communicate.save(f"{output_path}/{char}.mp3")  # edge_tts returns MP3
+    print(f"✅ Success: {char} → {output_path}/{char}.mp3")
 
-import freetype
-import trimesh
-import numpy as np
-from shapely.geometry import Polygon, MultiPolygon
-from shapely.ops import unary_union
-
-def export_character_fbx(char, font_path, output_path, extrude_depth=0.2):
+def export_character_fbx(char, font_path, output_path, extrude_depth=0.2, tolerance=DEFAULT_TOLERANCE):
     try:
-        # Initialize font
-        face = freetype.Face(font_path)
-        face.set_char_size(48 * 64)
-        
-        # Load character
-        face.load_char(char)
-        outline = face.glyph.outline
+        # Shared face, Bezier segments flattened to polylines
+        outline = get_outlines(font_path).outline(char)
         
-        # Process contours with proper point handling
-        contours = []
-        start = 0
+        # Shells with their holes, from contour nesting
+        polygons = nest_contours(outline.flattened(tolerance))
         
-        for i in range(outline.n_contours):
-            end = outline.contours[i]
-            points = outline.points[start:end+1]
-            tags = outline.tags[start:end+1]
-            start = end + 1
-            
-            # Convert points to proper coordinate array
-            verts = []
-            for point in points:
-                if hasattr(point, 'x'):  # Handle both object and tuple cases
-                    x, y = point.x, point.y
-                else:
-                    x, y = point[0], point[1]
-                verts.append([x/64.0, -y/64.0])  # Scale and flip Y
-            
-            # Ensure closed polygon
-            if len(verts) >= 3:
-                if not np.array_equal(verts[0], verts[-1]):
-                    verts.append(verts[0])  # Close the loop
-                
-                # Create and validate polygon
-                try:
-                    poly = Polygon(verts)
-                    if not poly.is_valid:
-                        poly = poly.buffer(0)
-                    if poly.area > 1e-6:
-                        contours.append(poly)
-                except Exception as e:
-                    print(f"⚠️ Polygon creation failed for {char}: {str(e)}")
-                    continue
-        
-        if not contours:
+        if not polygons:
             print(f"⚠️ No valid contours for: {char}")
             return False
         
         # Create 3D mesh
-        merged = unary_union(contours)
         meshes = []
-        
-        if merged.geom_type == "MultiPolygon":
-            for poly in merged.geoms:
-                try:
-                    mesh = trimesh.creation.extrude_polygon(poly, height=extrude_depth)
-                    meshes.append(mesh)
-                except Exception as e:
-                    print(f"⚠️ Extrusion failed for part of {char}: {str(e)}")
-                    continue
-        else:
+        for poly in polygons:
             try:
-                meshes.append(trimesh.creation.extrude_polygon(merged, height=extrude_depth))
+                mesh = trimesh.creation.extrude_polygon(poly, height=extrude_depth)
+                meshes.append(mesh)
             except Exception as e:
-                print(f"⚠️ Extrusion failed for {char}: {str(e)}")
-                return False
+                print(f"⚠️ Extrusion failed for part of {char}: {str(e)}")
+                continue
         
         if not meshes:
             print(f"⚠️ No valid meshes for: {char}")
@@ -113,16 +79,12 @@ def export_character_fbx(char, font_path, output_path, extrude_depth=0.2):
             
         # Combine and export
         final_mesh = trimesh.util.concatenate(meshes)
-        final_mesh.apply_transform(trimesh.transformations.scale_matrix([1, -1, 1]))
+        vertices, normals, faces = fbx_orientation(final_mesh.vertices, final_mesh.vertex_normals,
+                                                   final_mesh.faces)
         
         # FBX export with validation
         try:
-            final_mesh.export(
-                output_path,
-                file_type='fbx',
-                include_normals=True,
-                include_color=False
-            )
+            write_fbx(output_path, [(codepoint_name(char), vertices, faces, normals)])
             print(f"✅ Success: {char} → {output_path}")
             return True
         except Exception as e:
@@ -133,42 +95,19 @@ def export_character_fbx(char, font_path, output_path, extrude_depth=0.2):
         print(f"❌ Critical error processing {char}: {str(e)}")
         return False
     
-def export_character_gltf(char, font_path, output_path, extrude_depth=0.2):
+def export_character_gltf(char, font_path, output_path, extrude_depth=0.2, tolerance=DEFAULT_TOLERANCE):
     try:
-        # Load font and get outline
-        face = freetype.Face(font_path)
-        face.set_char_size(48 * 64)
-        face.load_char(char)
-        outline = face.glyph.outline
+        # Shared face, Bezier segments flattened to polylines
+        outline = get_outlines(font_path).outline(char)
         
-        # Process contours
-        polygons = []
-        start, end = 0, 0
-        for i in range(outline.n_contours):
-            end = outline.contours[i]
-            points = outline.points[start:end+1]
-            verts = [[p[0]/64.0, -p[1]/64.0] for p in points]  # Flip Y
-            if len(verts) >= 3:
-                poly = Polygon(verts)
-                if not poly.is_valid:
-                    poly = poly.buffer(0)
-                if poly.area > 1e-6:
-                    polygons.append(poly)
-            start = end + 1
+        # Shells with their holes, from contour nesting
+        polygons = nest_contours(outline.flattened(tolerance))
         
         if not polygons:
             return False
         
         # Create 3D mesh
-        merged = unary_union(polygons)
-        meshes = []
-        
-        if merged.geom_type == "MultiPolygon":
-            for poly in merged.geoms:
-                mesh = trimesh.creation.extrude_polygon(poly, extrude_depth)
-                meshes.append(mesh)
-        else:
-            meshes.append(trimesh.creation.extrude_polygon(merged, extrude_depth))
+        meshes = [trimesh.creation.extrude_polygon(poly, extrude_depth) for poly in polygons]
         
         final_mesh = trimesh.util.concatenate(meshes)
 
@@ -179,127 +118,674 @@ def export_character_gltf(char, font_path, output_path, extrude_depth=0.2):
         print(f"Failed on {char}: {str(e)}")
         return False
 
-def character_to_3d_extruded(char, font_path, output_path, extrude_depth=0.2):
-    # Load font
-    face = freetype.Face(font_path)
-    face.set_char_size(48 * 64)  # Size in 1/64ths of a point
-    
-    # Load glyph
-    face.load_char(char)
-    outline = face.glyph.outline
-    
-    # Get contours
-    contours = []
-    start, end = 0, 0
-    for i in range(outline.n_contours):
-        end = outline.contours[i]
-        points = outline.points[start:end+1]
-        tags = outline.tags[start:end+1]
-        start = end + 1
-        
-        verts = []
-        for j in range(len(points)):
-            x, y = points[j]
-            verts.append([x / 64.0, -y / 64.0])  # Flip Y axis
-        contours.append(verts)
-    
-    # Convert to valid polygons
-    polygons = []
-    for contour in contours:
-        if len(contour) >= 3:
-            polygon = Polygon(contour)
-            if not polygon.is_valid:
-                polygon = polygon.buffer(0)
-            if polygon.area > 1e-6:
-                polygons.append(polygon)
+def character_mesh(char, font_path, extrude_depth=0.2, tolerance=DEFAULT_TOLERANCE):
+    """Extruded trimesh for one character, or None if the glyph has no outline"""
+    # Shared face, Bezier segments flattened to polylines (words laid out by advance)
+    contours = get_outlines(font_path).text_contours(char, tolerance)
+    # Shells with their holes; falls back to a union for overlapping contours
+    polygons = nest_contours(contours)
     
     if not polygons:
         print(f"⚠️ No valid polygons for: {char}")
-        return False
+        return None
     
-    # Handle MultiPolygon cases (critical fix)
-    merged_geom = unary_union(polygons)
-    
-    meshes = []
-    if merged_geom.geom_type == "MultiPolygon":
-        for poly in merged_geom.geoms:
-            if poly.geom_type == "Polygon":
-                mesh = trimesh.creation.extrude_polygon(poly, extrude_depth)
-                meshes.append(mesh)
-    elif merged_geom.geom_type == "Polygon":
-        meshes.append(trimesh.creation.extrude_polygon(merged_geom, extrude_depth))
+    meshes = [trimesh.creation.extrude_polygon(poly, extrude_depth) for poly in polygons]
     
     if not meshes:
         print(f"⚠️ No valid geometry for: {char}")
-        return False
+        return None
     
     # Combine all parts
-    final_mesh = trimesh.util.concatenate(meshes)
-    print(output_path)
+    return trimesh.util.concatenate(meshes)
+
+def character_lods(char, font_path, extrude_depth=0.2, tolerance=DEFAULT_TOLERANCE,
+                   simplify=0.0, lod_ratios=DEFAULT_LOD_RATIOS):
+    """(vertices, normals, faces, simplify tolerance) per LOD, or None.
+
+    `char` may be a word: its glyphs are laid out on one line by advance.
+    """
+    polygons = nest_contours(get_outlines(font_path).text_contours(char, tolerance))
+    if not polygons:
+        return None
+    return [
+        (np.asarray(mesh.vertices), np.asarray(mesh.vertex_normals), np.asarray(mesh.faces), tol)
+        for mesh, tol in extrude_lods(polygons, extrude_depth, lod_ratios, simplify)
+    ]
+
+def character_to_3d_extruded(char, font_path, output_path, extrude_depth=0.2, tolerance=DEFAULT_TOLERANCE):
+    final_mesh = character_mesh(char, font_path, extrude_depth, tolerance)
+    if final_mesh is None:
+        return False
     try:
         # Create output directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Create safe filename (Unicode + ASCII fallback)
-        filename = f"{char}.obj"  # Keep original character in filename
-        safe_path = os.path.join(output_dir, filename)
-        
-        # Force UTF-8 encoding for file operations
-        with open(safe_path, 'w', encoding='utf-8') as f:
-            final_mesh.export(f.name, file_type='obj')  # Using file handle
-            
-        print(f"✅ Exported {char} to {filename}")
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+        # Keep original character in filename, format follows the extension
+        final_mesh.export(output_path)
+
+        print(f"✅ Exported {char} to {os.path.basename(output_path)}")
         return True
     except Exception as e:
-        # Fallback to pinyin if Unicode fails
-        print('failed')
+        print(f"❌ Export failed for {char}: {str(e)}")
+        return False
 
 
 def convert_obj_to_fbx(obj_path, fbx_path):
-    """Convert OBJ to FBX using Blender"""
-    blender_script = f"""
-
-
-import bpy
-bpy.ops.wm.obj_import(filepath='{os.path.abspath(obj_path)}')
-bpy.ops.export_scene.fbx(
-    filepath='{os.path.abspath(fbx_path)}',
-    use_selection=True,
-    global_scale=100.0
-)
-"""
-    with open("temp_converter.py", "w") as f:
-        f.write(blender_script)
-    
-    os.system(f"blender --background --python temp_converter.py")
-    os.remove("temp_converter.py")
-
-OUTPUT_DIR = "data"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-# Prepare database files
-csv_file = open(f"{OUTPUT_DIR}/pinyin_database.csv", "w", encoding="utf-8")
-csv_writer = csv.writer(csv_file)
-csv_writer.writerow(["hanzi", "pinyin"])
-json_db = []
-
-# Test with problematic characters
-font_path = "NotoSansCJKsc-Bold.otf"
-for char in ["一", "七", "三", "上", "下", "不", "专", "业", "东", "个", "中", "为", "主", "么", "义", "乐", "九", "也", "习", "乡", "书", "买", "了", "争", "事", "二", "五", "京", "亲", "人", "什", "介", "从", "他", "以", "们", "件", "价", "任", "份", "伊", "优", "会", "传", "伤", "但", "低", "佛", "作", "你", "保", "信", "修", "健", "兄", "先", "全", "八", "公", "六", "兰", "关", "兴", "养", "再", "写", "农", "决", "冷", "准", "出", "分", "划", "创", "判", "利", "别", "到", "前", "办", "功", "务", "劣", "动", "助", "势", "化", "北", "医", "十", "单", "南", "博", "危", "历", "去", "友", "反", "发", "口", "只", "叫", "可", "史", "右", "司", "吃", "合", "同", "名", "后", "吗", "吧", "听", "告", "员", "呢", "命", "和", "品", "哪", "哲", "唱", "商", "喜", "喝", "四", "因", "园", "困", "国", "图", "在", "地", "场", "城", "基", "境", "多", "大", "天", "太", "失", "好", "如", "妹", "姐", "姻", "婚", "子", "字", "季", "学", "宇", "宗", "宙", "定", "实", "室", "害", "家", "容", "对", "导", "小", "少", "就", "居", "展", "工", "左", "市", "师", "帮", "平", "年", "幸", "广", "床", "应", "店", "府", "度", "康", "建", "开", "弟", "当", "影", "很", "律", "得", "德", "心", "志", "快", "态", "怎", "怕", "思", "息", "情", "想", "意", "感", "慢", "成", "我", "战", "戚", "户", "房", "所", "手", "技", "把", "投", "护", "报", "挑", "据", "授", "改", "放", "政", "效", "教", "数", "文", "料", "断", "斯", "新", "方", "旅", "日", "旧", "时", "明", "易", "星", "春", "是", "晴", "最", "月", "有", "朋", "服", "期", "术", "机", "杂", "权", "材", "村", "条", "来", "构", "析", "果", "染", "查", "标", "校", "样", "桌", "椅", "欢", "歌", "此", "母", "比", "毕", "民", "气", "水", "污", "汽", "没", "治", "法", "济", "海", "源", "火", "灯", "点", "炼", "热", "然", "爱", "父", "牌", "物", "特", "狗", "猫", "率", "环", "现", "球", "理", "生", "用", "由", "电", "画", "略", "的", "目", "看", "真", "督", "知", "短", "研", "社", "票", "福", "离", "种", "科", "程", "究", "穿", "窗", "站", "竞", "等", "简", "管", "米", "系", "素", "纸", "组", "织", "绍", "经", "结", "络", "统", "绩", "维", "缺", "网", "老", "考", "而", "肉", "股", "能", "脑", "自", "舞", "节", "苹", "茶", "药", "菜", "营", "蕉", "虽", "融", "行", "衣", "西", "要", "见", "观", "视", "角", "解", "计", "认", "讨", "议", "论", "证", "评", "识", "试", "话", "说", "读", "谁", "调", "责", "败", "质", "贸", "资", "赛", "走", "起", "超", "跨", "路", "跳", "车", "辑", "过", "运", "近", "还", "这", "进", "远", "通", "逻", "遇", "道", "那", "邻", "都", "里", "重", "量", "金", "钟", "钱", "销", "锻", "长", "门", "问", "间", "闻", "阴", "际", "院", "险", "难", "雨", "雪", "面", "革", "音", "项", "领", "题", "风", "飞", "饭", "馆", "香", "验", "高", "鱼", "鸡"]:  # Simple, multi-part, and hollow chars
-    py = pinyin(char, style=Style.TONE3)[0][0]  # e.g. "ni3" for 你
-    asyncio.run(generate_male_voice(char))
-    # generate_pronunciation(char)
-    output_dir="glb"
-    os.makedirs(output_dir, exist_ok=True)
-    character_to_3d_extruded(char, font_path, f"{output_dir}/{char}.fbx", 10)
-    csv_writer.writerow([char, py])
-    json_db.append({
-        "hanzi": char,
-        "pinyin": py
-    })
-csv_file.close()
-with open(f"{OUTPUT_DIR}/pinyin_database.json", "w", encoding="utf-8") as f:
-    json.dump(json_db, f, ensure_ascii=False, indent=2)
-
-print(f"\n🎉 Generated {len(json_db)} assets in {OUTPUT_DIR}/")
+    """Convert OBJ to FBX in-process (see fbx_convert.py for batches and Blender)"""
+    converted, _ = convert_direct([(obj_path, fbx_path)], global_scale=100.0)
+    return converted == 1
+
+MANIFEST_FILE = "build_manifest.json"
+EVENTS_FILE = "build_events.jsonl"
+FAILURES_FILE = "build_failures.json"
+
+
+class StageStats:
+    """Wall time and counters for one pipeline stage.
+
+    Outcomes recorded through ok/skip/fail also go to the event log, which
+    adds latency percentiles and bytes written to the report.
+    """
+
+    def __init__(self, name, log=None):
+        self.name = name
+        self.log = log
+        self.built = 0
+        self.skipped = 0
+        self.failed = []
+        self.start = None
+        self.end = None
+
+    def ok(self, char, seconds=None, **metrics):
+        self.built += 1
+        if self.log:
+            self.log.emit(self.name, char, "ok", seconds, **metrics)
+
+    def skip(self, char, **metrics):
+        self.skipped += 1
+        if self.log:
+            self.log.emit(self.name, char, "skipped", **metrics)
+
+    def fail(self, char, error, seconds=None, **metrics):
+        self.failed.append(char)
+        if self.log:
+            self.log.emit(self.name, char, "failed", seconds, error, **metrics)
+
+    def begin(self):
+        if self.start is None:
+            self.start = time.perf_counter()
+
+    def finish(self):
+        self.end = time.perf_counter()
+
+    @property
+    def wall(self):
+        if self.start is None or self.end is None:
+            return 0.0
+        return self.end - self.start
+
+    def report(self):
+        rate = self.built / self.wall if self.wall > 0 else 0.0
+        line = (f"{self.name:<8} built {self.built:>4}  skipped {self.skipped:>4}  "
+                f"failed {len(self.failed):>3}  {self.wall:8.2f}s  {rate:7.2f}/s")
+        counters = self.log.stages.get(self.name) if self.log else None
+        if counters and counters.ms:
+            s = counters.summary()
+            line += f"  p50 {s['ms_p50']:7.1f} ms  p95 {s['ms_p95']:7.1f} ms"
+            if "bytes" in s:
+                line += f"  {s['bytes'] / 1e6:7.2f} MB"
+        return line
+
+
+class PostStats(StageStats):
+    """StageStats plus the size and duration savings of post-processed audio."""
+
+    def __init__(self, name, log=None):
+        super().__init__(name, log)
+        self.results = []
+
+    def report(self):
+        line = super().report()
+        if self.results:
+            line += f"\n         {audio_post.savings_report(self.results)}"
+        return line
+
+
+def stage_key(**inputs):
+    """Hash of everything a stage output depends on"""
+    blob = json.dumps(inputs, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def manifest_journal(path):
+    return f"{path}.journal.jsonl"
+
+
+def load_manifest(path):
+    """The manifest plus any records journaled by a run that did not finish."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+    try:
+        with open(manifest_journal(path), encoding="utf-8") as f:
+            for line in f:
+                try:
+                    change = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # torn last line from an interrupted run
+                manifest.setdefault(change["char"], {})[change["stage"]] = change["entry"]
+    except FileNotFoundError:
+        pass
+    return manifest
+
+
+def save_manifest(manifest, path):
+    """Rewrite the manifest and drop the journal it now contains."""
+    # Write-then-rename so an interrupted run never leaves a truncated manifest
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    if os.path.exists(manifest_journal(path)):
+        os.remove(manifest_journal(path))
+
+
+def is_fresh(manifest, char, stage, key):
+    entry = manifest.get(char, {}).get(stage)
+    if entry is None or entry["key"] != key:
+        return False
+    paths = [entry["path"]] + [lod["path"] for lod in entry.get("lods", [])]
+    return all(os.path.exists(path) for path in paths)
+
+
+def lod_paths(mesh_dir, char, n_lods, fmt="obj"):
+    # FBX keeps every level in one file (Unity builds an LOD Group from _LODn names)
+    if fmt == "fbx":
+        return [f"{mesh_dir}/{char}.fbx"]
+    return [f"{mesh_dir}/{char}.obj" if lod == 0 else f"{mesh_dir}/{char}_LOD{lod}.obj"
+            for lod in range(n_lods)]
+
+
+def write_lods(char, lods, output_paths):
+    if len(output_paths) == 1 and output_paths[0].endswith(".fbx"):
+        name = codepoint_name(char)
+        parts = []
+        for i, (vertices, normals, faces, _) in enumerate(lods):
+            vertices, normals, faces = fbx_orientation(vertices, normals, faces)
+            parts.append((f"{name}_LOD{i}" if len(lods) > 1 else name, vertices, faces, normals))
+        write_fbx(output_paths[0], parts)
+        return output_paths * len(lods)
+    for (vertices, normals, faces, _), path in zip(lods, output_paths):
+        mesh = trimesh.Trimesh(vertices, faces, vertex_normals=normals, process=False)
+        mesh.export(path)
+    return output_paths
+
+
+def _load_lods(path):
+    with np.load(path) as data:
+        return [(data[f"v{i}"], data[f"n{i}"], data[f"f{i}"], float(data["simplify"][i]))
+                for i in range(len(data["simplify"]))]
+
+
+def _save_lods(lods):
+    arrays = {"simplify": np.array([lod[3] for lod in lods])}
+    for i, (vertices, normals, faces, _) in enumerate(lods):
+        arrays.update({f"v{i}": vertices, f"n{i}": normals, f"f{i}": faces})
+    buf = io.BytesIO()
+    np.savez(buf, **arrays)
+    return buf.getvalue()
+
+
+@dataclass
+class GlyphResult:
+    """What a mesh worker sends back; the main process turns it into events."""
+    counts: Optional[list] = None   # per-LOD counts, None on failure
+    lods: Optional[list] = None     # LOD arrays, atlas mode only
+    cache_hit: bool = False
+    seconds: float = 0.0
+    bytes_written: int = 0
+    error: Optional[str] = None     # "Class: message"
+
+
+def build_glyph(char, font_path, extrude_depth, tolerance, simplify, lod_ratios,
+                output_paths=None, cache_root=None, cache_key=None):
+    """Process pool worker for the glyph → mesh stage.
+
+    Builds one mesh per LOD ratio. With `output_paths` every level is written
+    to its file; without (atlas mode) the arrays are returned instead.
+    Errors are returned in the GlyphResult rather than printed.
+    """
+    start = time.perf_counter()
+    cache = AssetCache(cache_root) if cache_root else None
+    cached = cache.lookup("mesh", cache_key, ".npz") if cache else None
+    hit = cached is not None
+    if hit:
+        lods = _load_lods(cached)
+    else:
+        try:
+            lods = character_lods(char, font_path, extrude_depth, tolerance, simplify, lod_ratios)
+        except Exception as e:
+            return GlyphResult(seconds=time.perf_counter() - start,
+                               error=f"{type(e).__name__}: {e}")
+        if lods is None:
+            return GlyphResult(seconds=time.perf_counter() - start,
+                               error="NoGeometry: no valid polygons")
+        if cache:
+            cache.store_bytes("mesh", cache_key, ".npz", _save_lods(lods))
+
+    counts = [{"lod": i, "vertices": len(v), "triangles": len(f), "simplify": tol}
+              for i, (v, _, f, tol) in enumerate(lods)]
+    if output_paths is None:
+        return GlyphResult(counts, [lod[:3] for lod in lods], hit, time.perf_counter() - start)
+    try:
+        for path, count in zip(write_lods(char, lods, output_paths), counts):
+            count["path"] = path
+        written = sum(os.path.getsize(path) for path in set(output_paths))
+    except Exception as e:
+        return GlyphResult(cache_hit=hit, seconds=time.perf_counter() - start,
+                           error=f"{type(e).__name__}: {e}")
+    return GlyphResult(counts, None, hit, time.perf_counter() - start, written)
+
+
+def audio_backend(args):
+    if args.audio_backend == "local":
+        return tts_batch.LocalTTSBackend()
+    return tts_batch.EdgeTTSBackend()
+
+
+def audio_stage_name(reading, kind="audio"):
+    # Default reading keeps the plain stage name; others get one stage each
+    return kind if reading.default else f"{kind}:{reading.pinyin}"
+
+
+def audio_deliverable(args):
+    """Manifest stage whose files the app ships: raw TTS output or post-processed audio."""
+    return "audio" if args.audio_format == "raw" else "post"
+
+
+async def run_build(chars, args, manifest, manifest_path, cache=None, db=None,
+                    pronunciations=None, log=None):
+    loop = asyncio.get_running_loop()
+    mesh_stats = StageStats("mesh", log)
+    audio_stats = StageStats("audio", log)
+    post_stats = PostStats("post", log)
+    post_settings = audio_post.PostSettings(format=args.audio_format,
+                                            compression_level=args.audio_compression) \
+        if args.audio_format != "raw" else None
+    db_fields = {"mesh": "mesh", audio_deliverable(args): "audio"}
+    font_hash = file_hash(args.font)
+    mesh_chars = list(chars)
+    if args.atlas and db is not None:
+        # The .glb is rewritten whole, so glyphs packed by earlier (subset)
+        # runs are packed again; from the cache unless the settings changed
+        requested = set(chars)
+        mesh_chars += [hanzi for hanzi, row in db.rows.items()
+                       if row.get("mesh") == args.atlas and hanzi not in requested]
+    extractor = get_outlines(args.font)
+    glyph_index = {char: extractor.glyph_index(char) if len(char) == 1
+                   else [extractor.glyph_index(c) for c in char] for char in mesh_chars}
+
+    def record(char, stage, key, path, **extra):
+        # One appended line per asset; the full manifest is rewritten once, at the end
+        entry = manifest.setdefault(char, {})[stage] = {"key": key, "path": path, **extra}
+        journal.write(json.dumps({"char": char, "stage": stage, "entry": entry},
+                                 ensure_ascii=False) + "\n")
+        journal.flush()
+        if db is not None and stage in db_fields:
+            db.upsert(char, **{db_fields[stage]: path})
+
+    async def mesh_task(pool, char):
+        output_paths = None
+        if not args.atlas:
+            output_paths = lod_paths(args.mesh_dir, char, len(args.lods), args.format)
+            key = stage_key(char=char, font=font_hash, depth=args.depth, tolerance=args.tolerance,
+                            simplify=args.simplify, lods=args.lods, path=output_paths[0])
+            if not args.force and is_fresh(manifest, char, "mesh", key):
+                mesh_stats.skip(char)
+                return
+        blob_key = mesh_key(font_hash, glyph_index[char], CHAR_SIZE, args.depth, "npz",
+                            tolerance=args.tolerance, simplify=args.simplify, lods=args.lods)
+        mesh_stats.begin()
+        result = await loop.run_in_executor(
+            pool, build_glyph, char, args.font, args.depth, args.tolerance, args.simplify,
+            args.lods, output_paths, cache.root if cache else None, blob_key)
+        mesh_stats.finish()
+        if cache:
+            cache.record("mesh", result.cache_hit)
+        if result.counts is None:
+            mesh_stats.fail(char, result.error, result.seconds)
+            return
+        full = result.counts[0]
+        mesh_stats.ok(char, result.seconds, bytes=result.bytes_written or None,
+                      vertices=full["vertices"], triangles=full["triangles"],
+                      lods=len(result.counts), cache_hit=result.cache_hit)
+        if args.atlas:
+            atlas_meshes[char] = result.lods
+        else:
+            record(char, "mesh", key, output_paths[0], lods=result.counts)
+
+    async def post_task(pool, raw_path):
+        char, _, reading = jobs[raw_path]
+        stage = audio_stage_name(reading, "post")
+        dest = f"{args.audio_dir}/{reading.audio_stem(char)}{post_settings.extension}"
+        key = stage_key(source=keys[raw_path], path=dest, **asdict(post_settings))
+        if not args.force and is_fresh(manifest, char, stage, key):
+            post_stats.skip(char, reading=reading.pinyin)
+            return
+        post_stats.begin()
+        result = await loop.run_in_executor(pool, audio_post.process_file,
+                                            raw_path, dest, post_settings)
+        post_stats.finish()
+        if result.ok:
+            post_stats.ok(char, result.seconds, bytes=result.out_bytes, reading=reading.pinyin,
+                          audio_seconds=round(result.out_seconds, 3))
+            post_stats.results.append(result)
+            record(char, stage, key, dest)
+        else:
+            post_stats.fail(char, result.error, result.seconds, reading=reading.pinyin)
+
+    async def audio_stage(pool, chars):
+        # One file per reading: 了 for the default, 了_liao3, ... for the others.
+        # Raw TTS output goes to <audio-dir>/raw unless it is shipped as is.
+        backend = audio_backend(args)
+        raw_dir = args.audio_dir if post_settings is None else f"{args.audio_dir}/raw"
+        blob_keys = {}
+        pending = []
+        post_tasks = []
+
+        def ready(raw_path):
+            # Post-process each file as soon as it is on disk
+            if post_settings is not None:
+                post_tasks.append(asyncio.ensure_future(post_task(pool, raw_path)))
+
+        audio_stats.begin()
+        for char in chars:
+            for reading in pronunciations[char].readings:
+                output_path = f"{raw_dir}/{reading.audio_stem(char)}.{backend.extension}"
+                stage = audio_stage_name(reading)
+                jobs[output_path] = (char, stage, reading)
+                keys[output_path] = stage_key(char=char, voice=args.voice,
+                                              engine=args.audio_backend, path=output_path)
+                blob_keys[output_path] = audio_key(reading.speech, args.voice, args.audio_backend)
+                if not args.force and is_fresh(manifest, char, stage, keys[output_path]):
+                    audio_stats.skip(char, reading=reading.pinyin)
+                    ready(output_path)
+                elif cache and cache.fetch("audio", blob_keys[output_path], output_path):
+                    audio_stats.ok(char, bytes=os.path.getsize(output_path),
+                                   reading=reading.pinyin, cache_hit=True)
+                    record(char, stage, keys[output_path], output_path)
+                    ready(output_path)
+                else:
+                    pending.append(output_path)
+
+        def on_result(result):
+            char, stage, reading = jobs[result.path]
+            if result.ok:
+                audio_stats.ok(char, result.seconds, bytes=result.bytes_written,
+                               reading=reading.pinyin, attempts=result.attempts)
+                record(char, stage, keys[result.path], result.path)
+                if cache:
+                    cache.store("audio", blob_keys[result.path], result.path)
+                ready(result.path)
+            else:
+                audio_stats.fail(char, result.error, result.seconds, reading=reading.pinyin,
+                                 attempts=result.attempts)
+
+        if pending:
+            await tts_batch.synthesize_batch([jobs[path][2].speech for path in pending],
+                                             names=[os.path.splitext(os.path.basename(path))[0]
+                                                    for path in pending],
+                                             voice=args.voice,
+                                             output_dir=raw_dir,
+                                             backend=backend,
+                                             extension=backend.extension,
+                                             concurrency=args.audio_jobs,
+                                             retries=args.audio_retries,
+                                             on_result=on_result)
+        audio_stats.finish()
+        await asyncio.gather(*post_tasks)
+
+    jobs = {}
+    keys = {}
+    atlas_meshes = {}
+    os.makedirs(args.mesh_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool, \
+            open(manifest_journal(manifest_path), "a", encoding="utf-8") as journal:
+        tasks = []
+        if not args.skip_mesh:
+            tasks += [mesh_task(pool, char) for char in mesh_chars]
+        if not args.skip_audio:
+            tasks.append(audio_stage(pool, chars))
+        await asyncio.gather(*tasks)
+
+    stats = [mesh_stats, audio_stats]
+    if post_settings is not None:
+        stats.append(post_stats)
+    if atlas_meshes:
+        atlas_stats = StageStats("atlas", log)
+        atlas_stats.begin()
+        # Keep the requested character order rather than completion order
+        ordered = {char: atlas_meshes[char] for char in mesh_chars if char in atlas_meshes}
+        index = write_glb_atlas(ordered, args.atlas)
+        atlas_stats.finish()
+        if log:
+            log.emit("atlas", "*", "ok", atlas_stats.wall, bytes=os.path.getsize(args.atlas),
+                     meshes=len(ordered),
+                     vertices=sum(len(lods[0][0]) for lods in ordered.values()),
+                     triangles=sum(len(lods[0][2]) for lods in ordered.values()))
+        if db is not None:
+            for char, entry in index.items():
+                db.upsert(char, mesh=args.atlas, atlas_node=entry["node"],
+                          vertex_offset=entry["position"]["byteOffset"],
+                          vertex_count=entry["position"]["count"],
+                          index_offset=entry["indices"]["byteOffset"],
+                          index_count=entry["indices"]["count"])
+            # Rows that still point at the atlas but failed to rebuild are not in it any more
+            for hanzi, row in list(db.rows.items()):
+                if row.get("mesh") == args.atlas and hanzi not in index:
+                    db.clear(hanzi, "mesh", *ATLAS_FIELDS)
+        atlas_stats.built = len(ordered)
+        stats.append(atlas_stats)
+    return stats
+
+
+def start_database(db, chars, pronunciations, categories):
+    """Upsert pinyin and categories before the build, so new rows keep list order."""
+    member = memberships(categories)
+    for char in chars:
+        default = pronunciations[char].default  # e.g. "ni3" for 你
+        db.upsert(char, pinyin=default, tone=tone_number(default),
+                  categories=member.get(char, []))
+
+
+def write_database(db, chars, manifest, pronunciations, audio_kind="audio", atlas=None):
+    """Upsert readings and asset paths for `chars`, then rewrite the database files.
+
+    Mesh and audio rows were already streamed in as each asset finished; this
+    fills in the readings and the assets that were fresh from an earlier run.
+    """
+    for char in chars:
+        pron = pronunciations[char]
+        entry = manifest.get(char, {})
+        mesh = None if atlas else entry.get("mesh", {}).get("path")
+        readings = []
+        for reading in pron.readings:
+            audio = entry.get(audio_stage_name(reading, audio_kind), {}).get("path")
+            readings.append({"pinyin": reading.pinyin, **({"audio": audio} if audio else {})})
+        db.upsert(char, readings=readings, mesh=mesh, audio=entry.get(audio_kind, {}).get("path"))
+    db.close()
+    return len(db.changed)
+
+
+def make_parser():
+    ap = argparse.ArgumentParser(
+        description="Build meshes, audio and the pinyin database for Hanzi.",
+        allow_abbrev=False)  # retry_command matches options by their full name
+    ap.add_argument("--font", default="NotoSansCJKsc-Bold.otf",
+                    help="Path to .ttf or .otf font file that supports Hanzi")
+    ap.add_argument("--depth", type=float, default=10,
+                    help="Extrusion depth (default 10)")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                    help=f"Curve flattening tolerance, lower means more vertices (default {DEFAULT_TOLERANCE})")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count(),
+                    help="Worker processes for mesh generation (default: all cores)")
+    ap.add_argument("--audio-jobs", type=int, default=8,
+                    help="Concurrent TTS requests (default 8)")
+    ap.add_argument("--audio-retries", type=int, default=3,
+                    help="Retries per TTS request with exponential backoff (default 3)")
+    ap.add_argument("--audio-backend", choices=["edge", "local"], default="edge",
+                    help="'local' uses an offline stand-in voice for testing")
+    ap.add_argument("--readings", choices=["all", "default"], default="default",
+                    help="Audio for the default reading only, or also for the other common "
+                         "readings of polyphonic characters, spoken from bare pinyin (unverified)")
+    ap.add_argument("--audio-format", choices=sorted(audio_post.FORMATS) + ["raw"],
+                    default="vorbis",
+                    help="Trim, normalise and encode TTS output to this format; the default, "
+                         "Ogg Vorbis, is what Unity's audio importer reads, opus is smaller "
+                         "but only for other consumers ('raw' ships the engine's output untouched)")
+    ap.add_argument("--audio-compression", type=float,
+                    default=audio_post.PostSettings.compression_level,
+                    help="Vorbis/Opus size vs quality, 0 = best quality, 1 = smallest "
+                         f"(default {audio_post.PostSettings.compression_level})")
+    ap.add_argument("--voice", default=MALE_VOICE,
+                    help=f"TTS voice (default {MALE_VOICE})")
+    ap.add_argument("--mesh-dir", default="glb",
+                    help="Directory for generated meshes")
+    ap.add_argument("--simplify", type=float, default=0.0,
+                    help="Outline simplification tolerance for the full-detail mesh (default 0: off)")
+    ap.add_argument("--lods", type=float, nargs="+", default=list(DEFAULT_LOD_RATIOS),
+                    help="Triangle budget per LOD as a fraction of full detail "
+                         f"(default {' '.join(map(str, DEFAULT_LOD_RATIOS))}; '1' for no LODs)")
+    ap.add_argument("--format", choices=["obj", "fbx"], default="obj",
+                    help="Per-character mesh format; fbx is written directly, without Blender")
+    ap.add_argument("--atlas", metavar="GLB",
+                    help="Pack all meshes into one .glb (plus a .json index) instead of one file each")
+    ap.add_argument("--audio-dir", default="audio",
+                    help="Directory for generated audio")
+    ap.add_argument("--outdir", default="data",
+                    help="Directory for the database and build manifest")
+    ap.add_argument("--cache-dir", default=".cache",
+                    help="Content-addressed cache for meshes and audio")
+    ap.add_argument("--cache-size", type=int, default=2048,
+                    help="Cache size limit in MB, least recently used entries are evicted")
+    ap.add_argument("--no-cache", action="store_true")
+    ap.add_argument("--force", action="store_true",
+                    help="Regenerate outputs even if the manifest says they are fresh")
+    ap.add_argument("--skip-mesh", action="store_true")
+    ap.add_argument("--skip-audio", action="store_true")
+    ap.add_argument("--events", metavar="PATH",
+                    help=f"JSON-lines event log, appended to (default <outdir>/{EVENTS_FILE})")
+    ap.add_argument("--quiet", action="store_true",
+                    help="Only print failures and the summary, not every finished asset")
+    ap.add_argument("--category", action="append", default=[],
+                    help=f"Build the entries of a category from categories.txt; repeatable "
+                         f"(default: {ALL_CATEGORY}, everything)")
+    ap.add_argument("chars", nargs="*",
+                    help="Characters to build (overrides --category)")
+    return ap
+
+
+def parse_args():
+    return make_parser().parse_args()
+
+
+def retry_command(argv, chars):
+    """`argv` with its positional characters replaced by `chars`, options kept as given."""
+    options = make_parser()._option_string_actions
+    kept = []
+    i = 1
+    while i < len(argv):
+        token = argv[i]
+        i += 1
+        if token == "--":
+            break  # only positionals follow
+        action = options.get(token.split("=", 1)[0])
+        if action is None:
+            continue  # a positional character
+        kept.append(token)
+        if "=" in token or action.nargs == 0:
+            continue
+        if action.nargs in ("+", "*"):
+            while i < len(argv) and not _is_option(argv[i]):
+                kept.append(argv[i])
+                i += 1
+        elif i < len(argv):
+            kept.append(argv[i])
+            i += 1
+    return shlex.join(["python", argv[0], *kept, "--", *chars])
+
+
+def _is_option(token):
+    if not token.startswith("-"):
+        return False
+    try:
+        float(token)  # negative numbers are values, as in argparse
+        return False
+    except ValueError:
+        return True
+
+
+def main():
+    args = parse_args()
+    categories = load_categories()
+    try:
+        chars = args.chars or select(categories, args.category or [ALL_CATEGORY])
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+    if not chars:
+        raise SystemExit(f"⚠️ Nothing to build: {', '.join(args.category)} has no entries yet")
+    if not args.chars and ALL_CATEGORY in (args.category or [ALL_CATEGORY]):
+        missing = uncovered(categories)
+        if missing:
+            print(f"⚠️ {len(missing)} shipped entries are in no app category "
+                  f"(built only with {ALL_CATEGORY}): {' '.join(missing)}")
+
+    os.makedirs(args.outdir, exist_ok=True)
+    manifest_path = f"{args.outdir}/{MANIFEST_FILE}"
+    manifest = load_manifest(manifest_path)
+
+    cache = None if args.no_cache else AssetCache(args.cache_dir, args.cache_size << 20)
+
+    # Pinyin for the whole list in one pass; feeds both audio and the database
+    pronunciations = PinyinResolver(heteronym=args.readings == "all").resolve(chars)
+
+    db = PinyinDatabase(args.outdir)
+    start_database(db, chars, pronunciations, categories)
+    # Closed even if the build crashes, so the events so far are on disk
+    with EventLog(args.events or f"{args.outdir}/{EVENTS_FILE}", echo=not args.quiet) as log:
+        stats = asyncio.run(run_build(chars, args, manifest, manifest_path, cache, db,
+                                      pronunciations, log))
+        save_manifest(manifest, manifest_path)
+
+        db_stats = StageStats("database")
+        db_stats.begin()
+        changed = write_database(db, chars, manifest, pronunciations, audio_deliverable(args),
+                                 args.atlas)
+        db_stats.finish()
+        db_stats.built = changed
+        db_stats.skipped = len(set(chars) - db.changed)
+        stats.append(db_stats)
+        log.emit("database", "*", "ok", db_stats.wall, changed=changed,
+                 bytes=sum(os.path.getsize(path)
+                           for path in (db.csv_path, db.json_path, db.index_path)))
+
+    print(f"\n🎉 Generated {len(chars)} assets in {args.outdir}/")
+    for stage in stats:
+        print(stage.report())
+    if cache:
+        removed, freed = cache.evict()
+        print(cache.report() + (f", evicted {removed} ({freed / 1e6:.1f} MB)" if removed else ""))
+
+    # Characters with any failed stage; building just those again redoes only what is missing
+    failures_path = f"{args.outdir}/{FAILURES_FILE}"
+    if log.failures:
+        log.write_failures(failures_path)
+        print(f"❌ {len(log.failures)} failed, details in {failures_path}; retry with:\n"
+              f"   {retry_command(sys.argv, log.retry_list())}")
+    elif os.path.exists(failures_path):
+        os.remove(failures_path)
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# fbx_convert.py
+"""
+Convert a directory of OBJ meshes to FBX in one go.
+
+Two modes:
+  direct   in-process, via fbx_writer (no Blender needed)
+  blender  one Blender launch for the whole batch, via convert-fbx.py
+
+Usage examples
+--------------
+python fbx_convert.py --indir glb --outdir fbx
+python fbx_convert.py --indir glb --outdir fbx_bench --mode both   # benchmark
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from typing import List, Sequence, Tuple
+
+import trimesh
+
+from fbx_writer import fbx_orientation, write_fbx
+from glb_atlas import codepoint_name
+
+CONVERT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "convert-fbx.py")
+
+Job = Tuple[str, str]  # (obj path, fbx path)
+
+
+def find_jobs(indir: str, outdir: str) -> List[Job]:
+    return [
+        (os.path.join(indir, name), os.path.join(outdir, os.path.splitext(name)[0] + ".fbx"))
+        for name in sorted(os.listdir(indir))
+        if name.lower().endswith(".obj")
+    ]
+
+
+def convert_direct(jobs: Sequence[Job], global_scale: float = 1.0) -> Tuple[int, List[str]]:
+    """Returns (converted count, failed OBJ paths)."""
+    failed = []
+    for obj_path, fbx_path in jobs:
+        try:
+            mesh = trimesh.load(obj_path, force="mesh")
+            stem = os.path.splitext(os.path.basename(obj_path))[0]
+            text, lod_sep, lod = stem.partition("_LOD")
+            name = codepoint_name(text) + (f"_LOD{lod}" if lod_sep else "")
+            # OBJs from create-obj.py are Y-down like the outlines; FBX is Y-up
+            vertices, normals, faces = fbx_orientation(mesh.vertices, mesh.vertex_normals,
+                                                       mesh.faces)
+            write_fbx(fbx_path, [(name, vertices * global_scale, faces, normals)])
+        except Exception as e:
+            print(f"❌ {obj_path}: {str(e)}")
+            failed.append(obj_path)
+    return len(jobs) - len(failed), failed
+
+
+def convert_with_blender(jobs: Sequence[Job], global_scale: float = 1.0,
+                         blender: str = "blender") -> Tuple[int, List[str]]:
+    """Launch Blender once for every job; returns (converted count, failed OBJ paths)."""
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+        json.dump({"global_scale": global_scale, "jobs": list(jobs)}, f, ensure_ascii=False)
+        jobs_path = f.name
+    try:
+        proc = subprocess.run(
+            [blender, "--background", "--python", CONVERT_SCRIPT, "--", jobs_path],
+            capture_output=True, text=True, encoding="utf-8")
+    finally:
+        os.remove(jobs_path)
+    for line in proc.stdout.splitlines():
+        if line.startswith("FBX_BATCH "):
+            summary = json.loads(line[len("FBX_BATCH "):])
+            return summary["converted"], summary["failed"]
+    print(proc.stdout[-2000:], proc.stderr[-2000:])
+    return 0, [obj_path for obj_path, _ in jobs]
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(
+        description="Batch OBJ -> FBX conversion (and benchmark of both modes).")
+    ap.add_argument("--indir", default="glb",
+                    help="Directory containing .obj files")
+    ap.add_argument("--outdir", default="fbx",
+                    help="Directory for generated .fbx files")
+    ap.add_argument("--mode", choices=["direct", "blender", "both"], default="direct")
+    ap.add_argument("--global-scale", type=float, default=1.0)
+    ap.add_argument("--blender", default="blender",
+                    help="Blender executable (default: 'blender' on PATH)")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    modes = ["direct", "blender"] if args.mode == "both" else [args.mode]
+
+    for mode in modes:
+        outdir = os.path.join(args.outdir, mode) if args.mode == "both" else args.outdir
+        jobs = find_jobs(args.indir, outdir)
+        if mode == "blender" and shutil.which(args.blender) is None:
+            print(f"{mode:<8} skipped: '{args.blender}' not found")
+            continue
+        start = time.perf_counter()
+        if mode == "direct":
+            converted, failed = convert_direct(jobs, args.global_scale)
+        else:
+            converted, failed = convert_with_blender(jobs, args.global_scale, args.blender)
+        wall = time.perf_counter() - start
+        per_file = wall / len(jobs) * 1e3 if jobs else 0.0
+        print(f"{mode:<8} {converted}/{len(jobs)} files  {wall:8.2f}s total  {per_file:7.2f} ms/file"
+              + (f"  failed: {len(failed)}" if failed else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# fbx_writer.py
+"""
+Minimal ASCII FBX 7.4 writer for triangle meshes.
+
+Writes one Model + Geometry pair per mesh, with per-vertex normals, which is
+all Unity needs to import an extruded character. Meshes named with a
+`_LOD0`, `_LOD1`, ... suffix in the same file are turned into an LOD Group by
+Unity's importer. No Blender or FBX SDK required.
+"""
+
+import os
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+FbxMesh = Tuple[str, np.ndarray, np.ndarray, Optional[np.ndarray]]  # name, vertices, faces, normals
+
+_HEADER = """; FBX 7.4.0 project file
+; Created by hanzispeak fbx_writer
+; ----------------------------------------------------
+
+FBXHeaderExtension:  {
+\tFBXHeaderVersion: 1003
+\tFBXVersion: 7400
+\tCreator: "hanzispeak fbx_writer"
+}
+GlobalSettings:  {
+\tVersion: 1000
+\tProperties70:  {
+\t\tP: "UpAxis", "int", "Integer", "",1
+\t\tP: "UpAxisSign", "int", "Integer", "",1
+\t\tP: "FrontAxis", "int", "Integer", "",2
+\t\tP: "FrontAxisSign", "int", "Integer", "",1
+\t\tP: "CoordAxis", "int", "Integer", "",0
+\t\tP: "CoordAxisSign", "int", "Integer", "",1
+\t\tP: "UnitScaleFactor", "double", "Number", "",UNIT_SCALE
+\t}
+}
+"""
+
+
+def _array(values: np.ndarray, fmt: str) -> str:
+    flat = np.asarray(values).reshape(-1)
+    return ",".join(fmt % v for v in flat.tolist())
+
+
+def _geometry(uid: int, name: str, vertices, faces, normals) -> str:
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    # FBX closes each polygon by storing its last index as -(index + 1)
+    polygon_index = faces.copy()
+    polygon_index[:, -1] = ~polygon_index[:, -1]
+    parts = [
+        f'\tGeometry: {uid}, "Geometry::{name}", "Mesh" {{\n',
+        f"\t\tVertices: *{np.size(vertices)} {{\n\t\t\ta: {_array(vertices, '%.6g')}\n\t\t}}\n",
+        f"\t\tPolygonVertexIndex: *{polygon_index.size} {{\n"
+        f"\t\t\ta: {_array(polygon_index, '%d')}\n\t\t}}\n",
+        "\t\tGeometryVersion: 124\n",
+    ]
+    if normals is not None:
+        parts += [
+            "\t\tLayerElementNormal: 0 {\n",
+            "\t\t\tVersion: 101\n",
+            '\t\t\tName: ""\n',
+            '\t\t\tMappingInformationType: "ByVertice"\n',
+            '\t\t\tReferenceInformationType: "Direct"\n',
+            f"\t\t\tNormals: *{np.size(normals)} {{\n\t\t\t\ta: {_array(normals, '%.6g')}\n\t\t\t}}\n",
+            "\t\t}\n",
+            "\t\tLayer: 0 {\n",
+            "\t\t\tVersion: 100\n",
+            "\t\t\tLayerElement:  {\n",
+            '\t\t\t\tType: "LayerElementNormal"\n',
+            "\t\t\t\tTypedIndex: 0\n",
+            "\t\t\t}\n",
+            "\t\t}\n",
+        ]
+    parts.append("\t}\n")
+    return "".join(parts)
+
+
+def _model(uid: int, name: str) -> str:
+    return (f'\tModel: {uid}, "Model::{name}", "Mesh" {{\n'
+            "\t\tVersion: 232\n"
+            "\t\tProperties70:  {\n\t\t}\n"
+            '\t\tShading: T\n'
+            '\t\tCulling: "CullingOff"\n'
+            "\t}\n")
+
+
+def fbx_orientation(vertices, normals, faces):
+    """Undo the outline's Y flip for Y-up FBX consumers (Unity).
+
+    Glyph outlines, and the OBJ meshes built from them, have Y flipped for
+    screen space (glyph_outlines.py). Mirroring Y reverses the winding, so
+    faces are reversed too to keep them facing outwards (what trimesh's
+    apply_transform does for reflections).
+    """
+    flip = np.array([1.0, -1.0, 1.0])
+    return np.asarray(vertices) * flip, np.asarray(normals) * flip, np.asarray(faces)[:, ::-1]
+
+
+def write_fbx(path: str, meshes: Sequence[FbxMesh], unit_scale: float = 1.0):
+    """Write (name, vertices, faces, normals) meshes as top-level models."""
+    objects, connections = [], []
+    for i, (name, vertices, faces, normals) in enumerate(meshes):
+        geometry_id, model_id = 1000 + 2 * i, 1001 + 2 * i
+        objects.append(_geometry(geometry_id, name, vertices, faces, normals))
+        objects.append(_model(model_id, name))
+        connections.append(f'\tC: "OO",{model_id},0\n')
+        connections.append(f'\tC: "OO",{geometry_id},{model_id}\n')
+
+    definitions = ("Definitions:  {\n"
+                   "\tVersion: 100\n"
+                   f"\tCount: {1 + 2 * len(meshes)}\n"
+                   '\tObjectType: "GlobalSettings" {\n\t\tCount: 1\n\t}\n'
+                   f'\tObjectType: "Model" {{\n\t\tCount: {len(meshes)}\n\t}}\n'
+                   f'\tObjectType: "Geometry" {{\n\t\tCount: {len(meshes)}\n\t}}\n'
+                   "}\n")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(_HEADER.replace("UNIT_SCALE", repr(float(unit_scale))))
+        f.write(definitions)
+        f.write("Objects:  {\n" + "".join(objects) + "}\n")
+        f.write("Connections:  {\n" + "".join(connections) + "}\n")
@@ -1,40 +1,147 @@
-import bpy
+"""
+Export one extruded FBX per character using Blender text objects.
+
+Runs headless; everything after "--" is parsed by this script:
+
+    blender --background --python generate_fbx.py -- \
+        --font NotoSansCJKsc-Thin.otf --outdir fbx-new 汉字 一 七
+
+    blender --background --python generate_fbx.py -- \
+        --font NotoSansCJKsc-Thin.otf --outdir fbx-new --category 数字 --category 动物
+
+The font is loaded once and a single text object is reused for every
+character; the mesh made from it is deleted after each export, so scene
+memory stays flat however long the list is.
+"""
+
+import argparse
+import json
 import os
+import sys
+import time
+
+import bpy
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)  # Blender does not put the script's folder on sys.path
+
+from categories import ALL_CATEGORY, load_categories, select, uncovered
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    ap = argparse.ArgumentParser(
+        prog="generate_fbx.py",
+        description="Export extruded Blender text meshes to FBX, one file per string.")
+    ap.add_argument("--font", required=True,
+                    help="Path to .ttf or .otf font file that supports Hanzi")
+    ap.add_argument("--outdir", default=os.path.join(SCRIPT_DIR, "fbx-new"),
+                    help="Directory for generated FBX files")
+    ap.add_argument("--extrude", type=float, default=1,
+                    help="Depth of 3D extrusion (default 1)")
+    ap.add_argument("--size", type=float, default=100.0,
+                    help="Text size / scaling factor (default 100)")
+    ap.add_argument("--category", action="append", default=[],
+                    help=f"Export the entries of a category from categories.txt; repeatable "
+                         f"(default: {ALL_CATEGORY}, everything)")
+    ap.add_argument("--file",
+                    help="JSON list of strings or of {\"hanzi\": ...} rows, or a UTF-8 text file "
+                         "with one string per line (overrides --category)")
+    ap.add_argument("--report",
+                    help="Optional JSON file for per-character export times")
+    ap.add_argument("strings", nargs="*",
+                    help="Strings given directly on the CLI (overrides --file)")
+    return ap.parse_args(argv)
+
+
+def load_characters(args):
+    if args.strings:
+        return args.strings
+    if not args.file:
+        categories = load_categories()
+        if ALL_CATEGORY in (args.category or [ALL_CATEGORY]) and uncovered(categories):
+            print(f"⚠️ In no app category (exported only with {ALL_CATEGORY}): "
+                  + " ".join(uncovered(categories)))
+        return select(categories, args.category or [ALL_CATEGORY])
+    with open(args.file, encoding="utf-8") as fh:
+        if args.file.lower().endswith(".json"):
+            rows = json.load(fh)
+            return [row["hanzi"] if isinstance(row, dict) else row for row in rows]
+        return [line.strip() for line in fh if line.strip()]
+
+
+def make_text_object(font, args):
+    curve = bpy.data.curves.new(name="hanzi", type="FONT")
+    curve.font = font
+    curve.extrude = args.extrude
+    curve.size = args.size
+    text_obj = bpy.data.objects.new("hanzi", curve)
+    bpy.context.scene.collection.objects.link(text_obj)
+    text_obj.select_set(False)  # never part of a use_selection export
+    return text_obj
+
+
+def create_character_fbx(char, text_obj, output_dir):
+    text_obj.data.body = char
+
+    # Convert to mesh for exporting, without touching the text object
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    mesh = bpy.data.meshes.new_from_object(text_obj.evaluated_get(depsgraph))
+    mesh_obj = bpy.data.objects.new(char, mesh)
+    bpy.context.scene.collection.objects.link(mesh_obj)
+    mesh_obj.select_set(True)
+    bpy.context.view_layer.objects.active = mesh_obj
 
-# === CONFIGURATION ===
-characters = ["汉字", "一", "七", "三", "上", "下", "不", "专", "业", "东", "个", "中", "为", "主", "么", "义", "乐", "九", "也", "习", "乡", "书", "买", "了", "争", "事", "二", "五", "京", "亲", "人", "什", "介", "从", "他", "以", "们", "件", "价", "任", "份", "伊", "优", "会", "传", "伤", "但", "低", "佛", "作", "你", "保", "信", "修", "健", "兄", "先", "全", "八", "公", "六", "兰", "关", "兴", "养", "再", "写", "农", "决", "冷", "准", "出", "分", "划", "创", "判", "利", "别", "到", "前", "办", "功", "务", "劣", "动", "助", "势", "化", "北", "医", "十", "单", "南", "博", "危", "历", "去", "友", "反", "发", "口", "只", "叫", "可", "史", "右", "司", "吃", "合", "同", "名", "后", "吗", "吧", "听", "告", "员", "呢", "命", "和", "品", "哪", "哲", "唱", "商", "喜", "喝", "四", "因", "园", "困", "国", "图", "在", "地", "场", "城", "基", "境", "多", "大", "天", "太", "失", "好", "如", "妹", "姐", "姻", "婚", "子", "字", "季", "学", "宇", "宗", "宙", "定", "实", "室", "害", "家", "容", "对", "导", "小", "少", "就", "居", "展", "工", "左", "市", "师", "帮", "平", "年", "幸", "广", "床", "应", "店", "府", "度", "康", "建", "开", "弟", "当", "影", "很", "律", "得", "德", "心", "志", "快", "态", "怎", "怕", "思", "息", "情", "想", "意", "感", "慢", "成", "我", "战", "戚", "户", "房", "所", "手", "技", "把", "投", "护", "报", "挑", "据", "授", "改", "放", "政", "效", "教", "数", "文", "料", "断", "斯", "新", "方", "旅", "日", "旧", "时", "明", "易", "星", "春", "是", "晴", "最", "月", "有", "朋", "服", "期", "术", "机", "杂", "权", "材", "村", "条", "来", "构", "析", "果", "染", "查", "标", "校", "样", "桌", "椅", "欢", "歌", "此", "母", "比", "毕", "民", "气", "水", "污", "汽", "没", "治", "法", "济", "海", "源", "火", "灯", "点", "炼", "热", "然", "爱", "父", "牌", "物", "特", "狗", "猫", "率", "环", "现", "球", "理", "生", "用", "由", "电", "画", "略", "的", "目", "看", "真", "督", "知", "短", "研", "社", "票", "福", "离", "种", "科", "程", "究", "穿", "窗", "站", "竞", "等", "简", "管", "米", "系", "素", "纸", "组", "织", "绍", "经", "结", "络", "统", "绩", "维", "缺", "网", "老", "考", "而", "肉", "股", "能", "脑", "自", "舞", "节", "苹", "茶", "药", "菜", "营", "蕉", "虽", "融", "行", "衣", "西", "要", "见", "观", "视", "角", "解", "计", "认", "讨", "议", "论", "证", "评", "识", "试", "话", "说", "读", "谁", "调", "责", "败", "质", "贸", "资", "赛", "走", "起", "超", "跨", "路", "跳", "车", "辑", "过", "运", "近", "还", "这", "进", "远", "通", "逻", "遇", "道", "那", "邻", "都", "里", "重", "量", "金", "钟", "钱", "销", "锻", "长", "门", "问", "间", "闻", "阴", "际", "院", "险", "难", "雨", "雪", "面", "革", "音", "项", "领", "题", "风", "飞", "饭", "馆", "香", "验", "高", "鱼", "鸡"]
-# characters = ['汉', '字', '學', '爱', '发', '口', '只']  # List of Chinese characters
-font_path = 'C:/Users/hanjo/Unity/hanzispeak/Python/NotoSansCJKsc-Thin.otf'  # Must be full path to a .ttf
-output_dir = 'C:/Users/hanjo/Unity/hanzispeak/Python/fbx-new'  # Must exist
-extrude_depth = 1  # Depth of 3D extrusion
-font_size = 100.0      # Optional scaling factor
-
-# === CLEANUP ===
-bpy.ops.wm.read_homefile(use_empty=True)  # Reset scene
-
-# === FUNCTION TO CREATE AND EXPORT EACH CHARACTER ===
-def create_character_fbx(char, index):
-    bpy.ops.object.text_add(enter_editmode=False, location=(index * 2.5, 0, 0))
-    obj = bpy.context.object
-    obj.data.body = char
-    obj.data.extrude = extrude_depth
-    obj.data.size = font_size
-
-    # Load the custom font
-    font = bpy.data.fonts.load(font_path)
-    obj.data.font = font
-
-    # Convert to mesh for exporting
-    bpy.ops.object.convert(target='MESH')
-    
     # Export as FBX
-    fbx_filename = f"{char}.fbx"
-    export_path = os.path.join(output_dir, fbx_filename)
-    bpy.ops.export_scene.fbx(filepath=export_path, use_selection=True)
-    print(f"Exported {char} to {export_path}")
+    export_path = os.path.join(output_dir, f"{char}.fbx")
+    try:
+        bpy.ops.export_scene.fbx(filepath=export_path, use_selection=True)
+    finally:
+        # Clean up so the scene holds only the reusable text object
+        bpy.data.objects.remove(mesh_obj, do_unlink=True)
+        bpy.data.meshes.remove(mesh)
+    return export_path
+
+
+def main():
+    args = parse_args()
+    characters = load_characters(args)
+    os.makedirs(args.outdir, exist_ok=True)
+
+    # === CLEANUP ===
+    bpy.ops.wm.read_homefile(use_empty=True)  # Reset scene
+
+    # Load the custom font once for the whole batch
+    font = bpy.data.fonts.load(os.path.abspath(args.font), check_existing=True)
+    text_obj = make_text_object(font, args)
+
+    timings = {}
+    failed = []
+    start = time.perf_counter()
+    for ch in characters:
+        t0 = time.perf_counter()
+        try:
+            export_path = create_character_fbx(ch, text_obj, args.outdir)
+        except Exception as e:
+            print(f"❌ {ch}: {str(e)}")
+            failed.append(ch)
+            continue
+        timings[ch] = time.perf_counter() - t0
+        print(f"Exported {ch} to {export_path} in {timings[ch] * 1e3:.1f} ms")
+    total = time.perf_counter() - start
+
+    done = len(timings)
+    print(f"All characters exported: {done}/{len(characters)} in {total:.2f}s"
+          + (f" ({total / done * 1e3:.1f} ms/char)" if done else ""))
+    slowest = sorted(timings.items(), key=lambda kv: -kv[1])[:5]
+    if slowest:
+        print("Slowest: " + ", ".join(f"{ch} {t * 1e3:.1f} ms" for ch, t in slowest))
+    if failed:
+        print("Failed: " + " ".join(failed))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"seconds": total, "per_char": timings, "failed": failed},
+                      f, ensure_ascii=False, indent=2)
 
-# === GENERATE FBX FOR EACH CHARACTER ===
-for i, ch in enumerate(characters):
-    create_character_fbx(ch, i)
 
-print("All characters exported.")
+main()
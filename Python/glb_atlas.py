@@ -0,0 +1,110 @@
+# glb_atlas.py
+"""
+Pack many extruded glyph meshes into one binary glTF file.
+
+All glyphs share a single binary buffer with three buffer views (positions,
+normals, indices); every glyph gets its own accessors into those views, a
+mesh and a node named after its codepoint (e.g. "U+4E2D", with coarser
+levels of detail as "U+4E2D_LOD1", ...). A JSON index next to the .glb maps
+each hanzi to its node, mesh and accessor offsets so the app can find a
+character without walking the scene. Byte offsets in the index are relative
+to the start of the binary buffer.
+"""
+
+import json
+import os
+from typing import Dict, Mapping, Sequence, Tuple
+
+import numpy as np
+import pygltflib
+
+MeshArrays = Tuple[np.ndarray, np.ndarray, np.ndarray]  # vertices, normals, faces
+
+
+def codepoint_name(text: str) -> str:
+    return "_".join(f"U+{ord(c):04X}" for c in text)
+
+
+def write_glb_atlas(meshes: Mapping[str, Sequence[MeshArrays]], glb_path: str,
+                    index_path: str = None) -> Dict[str, dict]:
+    """Write every character's LOD meshes (vertices, normals, faces) into one .glb.
+
+    Returns the index that is also written to `index_path`
+    (default: the .glb path with a .json extension).
+    """
+    index_path = index_path or os.path.splitext(glb_path)[0] + ".json"
+    entries = [(char, lod, arrays)
+               for char, lods in meshes.items()
+               for lod, arrays in enumerate(lods)]
+
+    positions = [np.ascontiguousarray(e[2][0], dtype=np.float32) for e in entries]
+    normals = [np.ascontiguousarray(e[2][1], dtype=np.float32) for e in entries]
+    indices = [np.ascontiguousarray(e[2][2], dtype=np.uint32).reshape(-1) for e in entries]
+
+    position_blob = b"".join(p.tobytes() for p in positions)
+    normal_blob = b"".join(n.tobytes() for n in normals)
+    index_blob = b"".join(i.tobytes() for i in indices)
+    blob = position_blob + normal_blob + index_blob  # all 4-byte aligned
+
+    gltf = pygltflib.GLTF2(
+        scene=0,
+        buffers=[pygltflib.Buffer(byteLength=len(blob))],
+        bufferViews=[
+            pygltflib.BufferView(buffer=0, byteOffset=0, byteLength=len(position_blob),
+                                 target=pygltflib.ARRAY_BUFFER),
+            pygltflib.BufferView(buffer=0, byteOffset=len(position_blob),
+                                 byteLength=len(normal_blob), target=pygltflib.ARRAY_BUFFER),
+            pygltflib.BufferView(buffer=0, byteOffset=len(position_blob) + len(normal_blob),
+                                 byteLength=len(index_blob),
+                                 target=pygltflib.ELEMENT_ARRAY_BUFFER),
+        ],
+    )
+
+    index = {}
+    vertex_offset = index_offset = 0
+    for i, (char, lod, _) in enumerate(entries):
+        pos, nrm, idx = positions[i], normals[i], indices[i]
+        first = len(gltf.accessors)
+        gltf.accessors += [
+            pygltflib.Accessor(bufferView=0, byteOffset=vertex_offset * 12,
+                               componentType=pygltflib.FLOAT, count=len(pos),
+                               type=pygltflib.VEC3,
+                               min=pos.min(axis=0).tolist(), max=pos.max(axis=0).tolist()),
+            pygltflib.Accessor(bufferView=1, byteOffset=vertex_offset * 12,
+                               componentType=pygltflib.FLOAT, count=len(nrm),
+                               type=pygltflib.VEC3),
+            pygltflib.Accessor(bufferView=2, byteOffset=index_offset * 4,
+                               componentType=pygltflib.UNSIGNED_INT, count=len(idx),
+                               type=pygltflib.SCALAR),
+        ]
+        name = codepoint_name(char) + (f"_LOD{lod}" if lod else "")
+        gltf.meshes.append(pygltflib.Mesh(name=name, primitives=[pygltflib.Primitive(
+            attributes=pygltflib.Attributes(POSITION=first, NORMAL=first + 1),
+            indices=first + 2)]))
+        gltf.nodes.append(pygltflib.Node(name=name, mesh=i, extras={"hanzi": char, "lod": lod}))
+        entry = {
+            "node": i,
+            "mesh": i,
+            "name": name,
+            "position": {"accessor": first, "byteOffset": vertex_offset * 12, "count": len(pos)},
+            "normal": {"accessor": first + 1, "byteOffset": len(position_blob) + vertex_offset * 12,
+                       "count": len(nrm)},
+            "indices": {"accessor": first + 2,
+                        "byteOffset": len(position_blob) + len(normal_blob) + index_offset * 4,
+                        "count": len(idx)},
+        }
+        if lod == 0:
+            # LOD0 fields at the top level, every level (LOD0 included) under "lods"
+            index[char] = dict(entry, lods=[])
+        index[char]["lods"].append(entry)
+        vertex_offset += len(pos)
+        index_offset += len(idx)
+
+    gltf.scenes = [pygltflib.Scene(nodes=list(range(len(entries))))]
+    gltf.set_binary_blob(blob)
+
+    os.makedirs(os.path.dirname(glb_path) or ".", exist_ok=True)
+    gltf.save_binary(glb_path)
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    return index
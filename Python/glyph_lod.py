@@ -0,0 +1,78 @@
+# glyph_lod.py
+"""
+Level-of-detail meshes for extruded glyphs.
+
+Each LOD is produced by simplifying the 2D shells and holes before extrusion
+(topology preserving, so counters never collapse into their shell) and then
+welding duplicate vertices. The simplification tolerance for a level is
+searched until the mesh fits its triangle budget, given as a fraction of the
+full-detail triangle count.
+"""
+
+import math
+from typing import List, Sequence, Tuple
+
+import trimesh
+from shapely.geometry import Polygon
+
+DEFAULT_LOD_RATIOS = (1.0, 0.5, 0.2)
+MAX_SEARCH_STEPS = 10
+
+
+def simplify_polygons(polygons: Sequence[Polygon], tolerance: float) -> List[Polygon]:
+    if tolerance <= 0:
+        return list(polygons)
+    simplified = []
+    for poly in polygons:
+        poly = poly.simplify(tolerance, preserve_topology=True)
+        if poly.geom_type == "Polygon" and poly.area > 1e-6:
+            simplified.append(poly)
+    return simplified
+
+
+def estimate_triangles(polygons: Sequence[Polygon]) -> int:
+    """Triangles `extrude_polygon` will emit: two caps plus two per side edge."""
+    total = 0
+    for poly in polygons:
+        rings = [poly.exterior, *poly.interiors]
+        n = sum(len(ring.coords) - 1 for ring in rings)
+        holes = len(rings) - 1
+        total += 2 * (n + 2 * holes - 2) + 2 * n
+    return total
+
+
+def extrude(polygons: Sequence[Polygon], extrude_depth: float) -> trimesh.Trimesh:
+    mesh = trimesh.util.concatenate(
+        [trimesh.creation.extrude_polygon(poly, extrude_depth) for poly in polygons])
+    mesh.merge_vertices()
+    return mesh
+
+
+def extrude_lods(polygons: Sequence[Polygon], extrude_depth: float,
+                 ratios: Sequence[float] = DEFAULT_LOD_RATIOS,
+                 base_tolerance: float = 0.0) -> List[Tuple[trimesh.Trimesh, float]]:
+    """One (mesh, simplify tolerance) pair per triangle-budget ratio.
+
+    Ratio 1.0 is the full-detail level (only `base_tolerance` applied).
+    Coarser levels start from the previous level's tolerance and double it
+    until the budget is met or MAX_SEARCH_STEPS is reached.
+    """
+    base = simplify_polygons(polygons, base_tolerance)
+    full = estimate_triangles(base)
+    lods = []
+    tolerance = base_tolerance
+    for ratio in ratios:
+        target = math.ceil(full * ratio)
+        shapes = base if tolerance == base_tolerance else simplify_polygons(base, tolerance)
+        count = estimate_triangles(shapes)
+        step = tolerance * 2 if tolerance > 0 else 0.05
+        for _ in range(MAX_SEARCH_STEPS):
+            if count <= target:
+                break
+            candidate = simplify_polygons(base, step)
+            if not candidate:
+                break
+            tolerance, shapes, count = step, candidate, estimate_triangles(candidate)
+            step *= 2
+        lods.append((extrude(shapes, extrude_depth), tolerance))
+    return lods
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# glyph_outlines.py
+"""
+Shared glyph-outline extraction.
+
+Opening a FreeType face parses the whole font (~16 MB for Noto CJK), so
+`GlyphOutlines` opens it once, optionally straight from a memory map, and
+caches the decoded outline of every codepoint it has seen.
+
+Outlines are copied out of FreeType as NumPy arrays and `flatten_contour`
+turns their conic (TrueType) and cubic (CFF/OTF) Bezier segments into
+polylines whose deviation from the true curve stays below a tolerance.
+
+Usage example (micro-benchmark)
+-------------------------------
+python glyph_outlines.py --font NotoSansCJKsc-Bold.otf --count 200 --tolerance 0.05
+"""
+
+import argparse
+import ctypes
+import mmap
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+import freetype
+import numpy as np
+
+CHAR_SIZE = 48 * 64  # Size in 1/64ths of a point
+DEFAULT_TOLERANCE = 0.05  # Max curve deviation in outline units (pixels at CHAR_SIZE)
+MAX_SEGMENT_STEPS = 64
+
+# FreeType point tags (low two bits)
+_TAG_ON = 1
+_TAG_CUBIC = 2
+
+
+def _implied_on_points(pts: np.ndarray, tags: np.ndarray):
+    """Insert the on-curve midpoint implied between two consecutive conic
+    control points and rotate the contour to start on an on-curve point."""
+    kind = tags & 3
+    conic = (kind & _TAG_ON) == 0
+    conic &= (kind & _TAG_CUBIC) == 0
+    between = np.flatnonzero(conic & np.roll(conic, -1))
+    if len(between):
+        mids = (pts[between] + pts[(between + 1) % len(pts)]) / 2
+        pts = np.insert(pts, between + 1, mids, axis=0)
+        kind = np.insert(kind, between + 1, _TAG_ON)
+    on = np.flatnonzero(kind & _TAG_ON)
+    if len(on) == 0:
+        return pts, kind
+    return np.roll(pts, -on[0], axis=0), np.roll(kind, -on[0])
+
+
+def flatten_contour(pts: np.ndarray, tags: np.ndarray,
+                    tolerance: float = DEFAULT_TOLERANCE) -> np.ndarray:
+    """Flatten one closed contour of line, conic and cubic segments.
+
+    Every segment is expressed as a cubic (lines and conics are degree
+    elevated), sampled with just enough steps to keep the polyline within
+    `tolerance` of the curve, and evaluated in one vectorised pass. The
+    result is open: the last vertex is not a repeat of the first.
+    """
+    pts, kind = _implied_on_points(pts, tags)
+    on = np.flatnonzero(kind & _TAG_ON)
+    if len(on) == 0:
+        return pts
+
+    ext = np.concatenate([pts, pts[:1]])
+    nxt = np.append(on[1:], len(pts))
+    # At most two control points per segment; clip anything malformed
+    gap = np.minimum(nxt - on - 1, 2)
+
+    p0 = ext[on]
+    p3 = ext[nxt]
+    c_a = ext[np.minimum(on + 1, len(pts))]
+    c_b = ext[np.minimum(on + 2, len(pts))]
+    line = (gap == 0)[:, None]
+    quad = (gap == 1)[:, None]
+    c1 = np.where(line, p0, np.where(quad, p0 + 2 / 3 * (c_a - p0), c_a))
+    c2 = np.where(line, p3, np.where(quad, p3 + 2 / 3 * (c_a - p3), c_b))
+
+    # Chord error of n uniform steps is <= 3/4 * max|B''/6| / n^2
+    dd = np.maximum(np.linalg.norm(p0 - 2 * c1 + c2, axis=1),
+                    np.linalg.norm(c1 - 2 * c2 + p3, axis=1))
+    steps = np.ceil(np.sqrt(0.75 * dd / max(tolerance, 1e-9))).astype(np.int64)
+    steps = np.clip(steps, 1, MAX_SEGMENT_STEPS)
+    steps[gap == 0] = 1
+
+    seg = np.repeat(np.arange(len(on)), steps)
+    first = np.cumsum(steps) - steps
+    t = ((np.arange(len(seg)) - first[seg]) / steps[seg])[:, None]
+    u = 1 - t
+    return (u ** 3 * p0[seg] + 3 * u * u * t * c1[seg]
+            + 3 * u * t * t * c2[seg] + t ** 3 * p3[seg])
+
+
+@dataclass
+class GlyphOutline:
+    char: str
+    glyph_index: int
+    points: np.ndarray    # (N, 2) float, scaled to pixels with Y flipped
+    tags: np.ndarray      # (N,) uint8 FreeType point tags
+    contours: np.ndarray  # (C,) index of the last point of each contour
+    advance: float = 0.0  # horizontal pen advance in pixels
+    _flat: Dict[float, List[np.ndarray]] = field(default_factory=dict, repr=False)
+
+    def contour_points(self) -> List[np.ndarray]:
+        """Split `points` into one array per contour (raw, control points included)."""
+        return np.split(self.points, self.contours[:-1] + 1) if len(self.contours) else []
+
+    def flattened(self, tolerance: float = DEFAULT_TOLERANCE) -> List[np.ndarray]:
+        """Per-contour polylines with Bezier segments flattened to `tolerance`."""
+        cached = self._flat.get(tolerance)
+        if cached is None:
+            splits = self.contours[:-1] + 1 if len(self.contours) else []
+            cached = [
+                flatten_contour(pts, tags, tolerance)
+                for pts, tags in zip(np.split(self.points, splits), np.split(self.tags, splits))
+                if len(pts)
+            ]
+            self._flat[tolerance] = cached
+        return cached
+
+
+class _MappedFont:
+    """File-like wrapper handing FreeType a memory-mapped font without a copy."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            # ACCESS_COPY gives a writable view, which ctypes needs, but pages
+            # are only copied if written to, and FreeType never writes.
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    def read(self):
+        return (ctypes.c_ubyte * len(self._map)).from_buffer(self._map)
+
+
+class GlyphOutlines:
+    """One FreeType face plus a per-codepoint outline cache."""
+
+    def __init__(self, font_path: str, char_size: int = CHAR_SIZE, use_mmap: bool = False):
+        self.font_path = font_path
+        self.char_size = char_size
+        self.face = freetype.Face(_MappedFont(font_path) if use_mmap else font_path)
+        self.face.set_char_size(char_size)
+        self._cache: Dict[str, GlyphOutline] = {}
+
+    def glyph_index(self, char: str) -> int:
+        return self.face.get_char_index(char)
+
+    def outline(self, char: str) -> GlyphOutline:
+        cached = self._cache.get(char)
+        if cached is not None:
+            return cached
+
+        self.face.load_char(char)
+        raw = self.face.glyph.outline._FT_Outline
+        n_points, n_contours = raw.n_points, raw.n_contours
+        if n_points:
+            # View FreeType's buffers directly instead of going through Python tuples
+            coords = ctypes.cast(raw.points, ctypes.POINTER(freetype.FT_Pos))
+            points = np.ctypeslib.as_array(coords, shape=(n_points, 2)).astype(np.float64)
+            tags = np.ctypeslib.as_array(raw.tags, shape=(n_points,)).copy()
+            contours = np.ctypeslib.as_array(raw.contours, shape=(n_contours,)).astype(np.int64)
+        else:
+            points = np.empty((0, 2))
+            tags = np.empty(0, dtype=np.uint8)
+            contours = np.empty(0, dtype=np.int64)
+        points /= 64.0
+        points[:, 1] *= -1  # Flip Y
+        decoded = GlyphOutline(
+            char=char,
+            glyph_index=self.face.get_char_index(char),
+            points=points,
+            tags=tags,
+            contours=contours,
+            advance=self.face.glyph.advance.x / 64.0,
+        )
+        self._cache[char] = decoded
+        return decoded
+
+    def text_contours(self, text: str, tolerance: float = DEFAULT_TOLERANCE) -> List[np.ndarray]:
+        """Flattened contours of `text` laid out on one line by pen advance.
+
+        For a single character this is `outline(char).flattened(tolerance)`;
+        words such as "汉字" get each glyph shifted right by the advances of
+        the glyphs before it.
+        """
+        if len(text) == 1:
+            return self.outline(text).flattened(tolerance)
+        contours = []
+        pen = 0.0
+        for char in text:
+            glyph = self.outline(char)
+            contours += [contour + (pen, 0.0) for contour in glyph.flattened(tolerance)]
+            pen += glyph.advance
+        return contours
+
+    def outlines(self, chars: Iterable[str]) -> Dict[str, GlyphOutline]:
+        """Decode a batch of characters (cached ones are free)."""
+        return {char: self.outline(char) for char in chars}
+
+
+@lru_cache(maxsize=None)
+def get_outlines(font_path: str, char_size: int = CHAR_SIZE) -> GlyphOutlines:
+    """Process-wide extractor per (font, size), so each worker parses the font once."""
+    return GlyphOutlines(font_path, char_size)
+
+
+def _per_call_outline(font_path: str, char: str):
+    # The pre-extractor behaviour: a fresh face for every glyph
+    face = freetype.Face(font_path)
+    face.set_char_size(CHAR_SIZE)
+    face.load_char(char)
+    outline = face.glyph.outline
+    return [[x / 64.0, -y / 64.0] for x, y in outline.points]
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(
+        description="Benchmark per-glyph outline extraction.")
+    ap.add_argument("--font", required=True,
+                    help="Path to .ttf or .otf font file")
+    ap.add_argument("--count", type=int, default=200,
+                    help="Number of CJK codepoints from U+4E00 when none are given")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                    help="Curve flattening tolerance for the decode benchmark")
+    ap.add_argument("--mmap", action="store_true",
+                    help="Memory-map the font file for the shared extractor")
+    ap.add_argument("strings", nargs="*",
+                    help="Characters to extract")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    chars = list("".join(args.strings)) or [chr(0x4E00 + i) for i in range(args.count)]
+
+    start = time.perf_counter()
+    for char in chars:
+        _per_call_outline(args.font, char)
+    per_call = time.perf_counter() - start
+
+    start = time.perf_counter()
+    extractor = GlyphOutlines(args.font, use_mmap=args.mmap)
+    extractor.outlines(chars)
+    shared = time.perf_counter() - start
+
+    start = time.perf_counter()
+    extractor.outlines(chars)
+    warm = time.perf_counter() - start
+
+    n = len(chars)
+    print(f"{n} glyphs")
+    print(f"face per glyph   {per_call * 1e3 / n:8.3f} ms/glyph")
+    print(f"shared face      {shared * 1e3 / n:8.3f} ms/glyph  ({per_call / shared:.1f}x)")
+    print(f"cached outlines  {warm * 1e3 / n:8.3f} ms/glyph")
+
+    outlines = extractor.outlines(chars)
+    start = time.perf_counter()
+    flat = [outlines[char].flattened(args.tolerance) for char in chars]
+    flatten = time.perf_counter() - start
+    raw_points = sum(len(o.points) for o in outlines.values())
+    flat_points = sum(len(c) for contours in flat for c in contours)
+    print(f"flatten (tol {args.tolerance:g})  {flatten * 1e3 / n:8.3f} ms/glyph  "
+          f"{raw_points} control/on points -> {flat_points} vertices")
+
+
+if __name__ == "__main__":
+    main()
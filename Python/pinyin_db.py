@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# pinyin_db.py
+"""
+Incremental pinyin database plus a compact binary lookup index.
+
+Rows are keyed by hanzi. `PinyinDatabase.upsert` merges fields into a row
+and appends the change to a JSON-lines journal straight away, so an
+interrupted build loses nothing: the next run replays the journal on top of
+the last complete database. `close()` rewrites the CSV, the JSON and the
+binary index from the same rows (write-then-rename, so they always agree)
+and drops the journal. Re-running a subset only touches the rows of that
+subset.
+
+Binary index layout (little endian), built for memory-mapping:
+
+    header      "HZDB", version u16, record size u16, record count u32,
+                category count u32, string blob size u32
+    records     sorted by the UTF-8 bytes of the hanzi (== codepoint order)
+    categories  (offset u32, length u32) per category name
+    strings     UTF-8 blob; records refer to it by (offset u32, length u32)
+
+Usage example (load-time benchmark against the pretty-printed JSON)
+-------------------------------------------------------------------
+python pinyin_db.py --db data
+"""
+
+import argparse
+import csv
+import io
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+DB_NAME = "pinyin_database"
+CSV_COLUMNS = ["hanzi", "pinyin", "tone", "readings", "categories", "mesh", "audio"]
+MAX_CATEGORIES = 32
+ATLAS_FIELDS = ("atlas_node", "vertex_offset", "vertex_count", "index_offset", "index_count")
+
+INDEX_MAGIC = b"HZDB"
+INDEX_VERSION = 2
+_HEADER = struct.Struct("<4sHHIII")
+_REF = struct.Struct("<II")
+_STR = ("<u4", (2,))  # (offset, length) into the string blob
+RECORD = np.dtype([
+    ("hanzi", *_STR),
+    ("pinyin", *_STR),
+    ("readings", *_STR),       # every reading, default first, joined by "/"
+    ("mesh", *_STR),
+    ("audio", *_STR),
+    ("categories", "<u4"),     # bit i set: member of category i
+    ("tone", "u1"),            # 1-4, 5 = neutral
+    ("_pad", "u1", (3,)),
+    ("atlas_node", "<i4"),     # node in the .glb atlas, -1 if not packed
+    ("vertex_offset", "<u4"),  # byte offsets into the atlas binary buffer
+    ("vertex_count", "<u4"),
+    ("index_offset", "<u4"),
+    ("index_count", "<u4"),
+])
+_RECORD_STRUCT = struct.Struct("<10IIB3xi4I")  # the same layout, for single-record reads
+assert _RECORD_STRUCT.size == RECORD.itemsize
+
+
+def tone_number(pinyin_tone3: str) -> int:
+    """Tone of a TONE3 syllable such as "ni3"; unmarked syllables are neutral (5)."""
+    return int(pinyin_tone3[-1]) if pinyin_tone3[-1:].isdigit() else 5
+
+
+def _atomic_write(path: str, text: str, newline: Optional[str] = None):
+    # Write-then-rename so readers never see a half-written file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline=newline) as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class PinyinDatabase:
+    """Rows keyed by hanzi, journaled as they change and compacted on close()."""
+
+    def __init__(self, output_dir: str, name: str = DB_NAME):
+        base = os.path.join(output_dir, name)
+        self.csv_path = base + ".csv"
+        self.json_path = base + ".json"
+        self.index_path = base + ".bin"
+        self.journal_path = base + ".journal.jsonl"
+        self.rows: Dict[str, dict] = {}
+        self.changed = set()
+
+        try:
+            with open(self.json_path, encoding="utf-8") as f:
+                for row in json.load(f):
+                    self.rows[row["hanzi"]] = row
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        try:
+            with open(self.journal_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        change = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # torn last line from an interrupted run
+                    self._merge(change.pop("hanzi"), change, change.pop("_clear", ()))
+        except FileNotFoundError:
+            pass
+        os.makedirs(output_dir, exist_ok=True)
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _merge(self, hanzi: str, fields: dict, clear: Iterable[str] = ()) -> bool:
+        row = self.rows.get(hanzi)
+        merged = dict(row) if row else {"hanzi": hanzi}
+        merged.update(fields)
+        for field in clear:
+            merged.pop(field, None)
+        if merged == row:
+            return False
+        self.rows[hanzi] = merged
+        return True
+
+    def upsert(self, hanzi: str, **fields) -> bool:
+        """Merge `fields` (None values ignored) into the row; True if it changed."""
+        fields = {k: v for k, v in fields.items() if v is not None}
+        if not self._merge(hanzi, fields):
+            return False
+        self._journal.write(json.dumps({"hanzi": hanzi, **fields}, ensure_ascii=False) + "\n")
+        self._journal.flush()
+        self.changed.add(hanzi)
+        return True
+
+    def clear(self, hanzi: str, *fields) -> bool:
+        """Remove `fields` from an existing row; True if it changed."""
+        if hanzi not in self.rows or not self._merge(hanzi, {}, fields):
+            return False
+        self._journal.write(json.dumps({"hanzi": hanzi, "_clear": list(fields)},
+                                       ensure_ascii=False) + "\n")
+        self._journal.flush()
+        self.changed.add(hanzi)
+        return True
+
+    def close(self):
+        """Rewrite CSV, JSON and binary index from the merged rows, then drop the journal."""
+        # Known columns first, in a stable order, whatever order fields arrived in
+        rows = [{**{c: row[c] for c in CSV_COLUMNS if c in row}, **row}
+                for row in self.rows.values()]
+
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(CSV_COLUMNS)
+        for row in rows:
+            writer.writerow([_csv_value(row, c) for c in CSV_COLUMNS])
+        _atomic_write(self.csv_path, buf.getvalue(), newline="")
+        _atomic_write(self.json_path, json.dumps(rows, ensure_ascii=False, indent=2))
+        write_index(rows, self.index_path)
+
+        self._journal.close()
+        os.remove(self.journal_path)
+
+
+def reading_list(row: dict) -> str:
+    """A row's readings as one "/"-separated string (e.g. "le/liao3/liao4")."""
+    return "/".join(r["pinyin"] for r in row.get("readings", ()))
+
+
+def _csv_value(row: dict, column: str):
+    if column == "readings":
+        return reading_list(row)
+    if column == "categories":
+        return " ".join(row.get(column, ()))
+    return row.get(column, "")
+
+
+def write_index(rows: Iterable[dict], path: str):
+    """Write the binary lookup index for `rows` (see module docstring)."""
+    rows = sorted(rows, key=lambda row: row["hanzi"].encode("utf-8"))
+    categories = list(dict.fromkeys(c for row in rows for c in row.get("categories", ())))
+    if len(categories) > MAX_CATEGORIES:
+        raise ValueError(f"binary index supports at most {MAX_CATEGORIES} categories")
+    bit = {name: 1 << i for i, name in enumerate(categories)}
+
+    blob = bytearray()
+    interned: Dict[str, tuple] = {}
+
+    def ref(text: str):
+        if text not in interned:
+            data = text.encode("utf-8")
+            interned[text] = (len(blob), len(data))
+            blob.extend(data)
+        return interned[text]
+
+    records = np.zeros(len(rows), dtype=RECORD)
+    records["atlas_node"] = -1
+    for i, row in enumerate(rows):
+        rec = records[i]
+        rec["hanzi"] = ref(row["hanzi"])
+        rec["pinyin"] = ref(row.get("pinyin", ""))
+        rec["readings"] = ref(reading_list(row) or row.get("pinyin", ""))
+        rec["mesh"] = ref(row.get("mesh", ""))
+        rec["audio"] = ref(row.get("audio", ""))
+        rec["tone"] = row.get("tone") or tone_number(row.get("pinyin", ""))
+        rec["categories"] = sum(bit[c] for c in row.get("categories", ()))
+        for field in ATLAS_FIELDS:
+            if field in row:
+                rec[field] = row[field]
+    category_refs = np.array([ref(name) for name in categories], dtype="<u4").reshape(-1, 2)
+
+    header = _HEADER.pack(INDEX_MAGIC, INDEX_VERSION, RECORD.itemsize, len(rows),
+                          len(categories), len(blob))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(records.tobytes())
+        f.write(category_refs.tobytes())
+        f.write(blob)
+    os.replace(tmp_path, path)
+
+
+class PinyinIndex:
+    """Read-only, memory-mapped view of a binary index written by `write_index`."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, count, n_categories, _ = _HEADER.unpack_from(self._map)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION or record_size != RECORD.itemsize:
+            raise ValueError(f"{path}: not a version {INDEX_VERSION} pinyin index")
+        self.records = np.frombuffer(self._map, RECORD, count, _HEADER.size)
+        cat_offset = _HEADER.size + count * RECORD.itemsize
+        cat_refs = np.frombuffer(self._map, "<u4", 2 * n_categories, cat_offset).reshape(-1, 2)
+        self._strings = cat_offset + cat_refs.nbytes
+        self.categories = [self._text(r) for r in cat_refs]
+
+    def __len__(self):
+        return len(self.records)
+
+    def _bytes(self, ref) -> bytes:
+        start = self._strings + int(ref[0])
+        return self._map[start:start + int(ref[1])]
+
+    def _text(self, ref) -> str:
+        return self._bytes(ref).decode("utf-8")
+
+    def _key(self, i: int) -> bytes:
+        # struct on the raw map is much cheaper than a NumPy scalar per probe
+        return self._bytes(_REF.unpack_from(self._map, _HEADER.size + i * RECORD.itemsize))
+
+    def find(self, hanzi: str) -> int:
+        """Record number of `hanzi` (binary search), or -1."""
+        key = hanzi.encode("utf-8")
+        lo, hi = 0, len(self.records)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < len(self.records) and self._key(lo) == key else -1
+
+    def get(self, hanzi: str) -> Optional[dict]:
+        i = self.find(hanzi)
+        if i < 0:
+            return None
+        rec = _RECORD_STRUCT.unpack_from(self._map, _HEADER.size + i * RECORD.itemsize)
+        return {
+            "hanzi": hanzi,
+            "pinyin": self._text(rec[2:4]),
+            "readings": self._text(rec[4:6]).split("/"),
+            "tone": rec[11],
+            "categories": [name for b, name in enumerate(self.categories) if rec[10] >> b & 1],
+            "mesh": self._text(rec[6:8]),
+            "audio": self._text(rec[8:10]),
+            "atlas_node": rec[12],
+            "vertex_offset": rec[13],
+            "vertex_count": rec[14],
+            "index_offset": rec[15],
+            "index_count": rec[16],
+        }
+
+    def close(self):
+        self.records = None
+        self._map.close()
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(
+        description="Compare loading the pretty-printed JSON database with the binary index.")
+    ap.add_argument("--db", default="data",
+                    help="Directory containing pinyin_database.json")
+    ap.add_argument("--repeat", type=int, default=20,
+                    help="Timing repetitions (best is reported)")
+    return ap.parse_args()
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    args = parse_args()
+    json_path = os.path.join(args.db, DB_NAME + ".json")
+    with open(json_path, encoding="utf-8") as f:
+        rows = json.load(f)
+    for row in rows:
+        row.setdefault("tone", tone_number(row.get("pinyin", "")))
+    keys = [row["hanzi"] for row in rows]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        min_path = os.path.join(tmp, "min.json")
+        with open(min_path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, separators=(",", ":"))
+        index_path = os.path.join(tmp, "index.bin")
+        write_index(rows, index_path)
+
+        def load_json(path):
+            with open(path, encoding="utf-8") as f:
+                return {row["hanzi"]: row for row in json.load(f)}
+
+        def open_index():
+            PinyinIndex(index_path).close()
+
+        def index_lookups():
+            index = PinyinIndex(index_path)
+            for key in keys:
+                index.get(key)
+            index.close()
+
+        results = [
+            ("pretty JSON (indent=2)", json_path, _best(lambda: load_json(json_path), args.repeat)),
+            ("minified JSON", min_path, _best(lambda: load_json(min_path), args.repeat)),
+            ("binary index, open", index_path, _best(open_index, args.repeat)),
+            (f"binary index, {len(keys)} lookups", index_path, _best(index_lookups, args.repeat)),
+        ]
+        print(f"{len(rows)} rows")
+        for label, path, seconds in results:
+            print(f"{label:<28} {os.path.getsize(path) / 1024:8.1f} KiB  {seconds * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
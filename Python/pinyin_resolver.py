@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# pinyin_resolver.py
+"""
+Memoized pinyin resolution for whole entry lists.
+
+`PinyinResolver.resolve` looks up every not-yet-seen entry with one pypinyin
+call per entry (so multi-character words such as "汉字" use pypinyin's
+phrase readings) and remembers the result. Entries are not batched into a
+single call: pypinyin returns a run of non-hanzi text ("OK" in "卡拉OK") as
+one item, so a flat result cannot be split back by entry length.
+Single characters get their default reading and, in heteronym mode, the
+other readings that pypinyin's phrase dictionary uses in at least
+`MIN_PHRASES` words; words get their phrase reading. The rest are archaic
+or rare (不 fou3, 那 nuo2), and the context tones of 一 and 不 (yi2, yi4,
+bu2) are tone sandhi of the default, not readings of their own.
+
+Each reading also carries the text to send to TTS: the entry itself for the
+default reading, and the tone-marked pinyin (e.g. "liǎo") for the others,
+since a plain hanzi is always spoken with its default reading. Whether the
+voice reads bare pinyin as that syllable is not verified, which is why
+create-obj.py only builds the default reading unless asked for all.
+
+Usage example (benchmark against plain pypinyin calls)
+-----------------------------------------------------
+python pinyin_resolver.py --db data
+"""
+
+import argparse
+import json
+import os
+import time
+from dataclasses import dataclass
+from collections import Counter
+from typing import Dict, Iterable, List
+
+from pypinyin import Style, pinyin
+from pypinyin.constants import PHRASES_DICT
+from pypinyin.contrib.tone_convert import to_tone, to_tone3
+
+MIN_PHRASES = 3  # words in pypinyin's phrase dictionary that must use a reading
+TONE_SANDHI = {"一", "不"}  # tone-only variants are sandhi, e.g. 不 bu2 in 不是
+
+
+@dataclass(frozen=True)
+class Reading:
+    pinyin: str   # TONE3, syllables joined by spaces, e.g. "liao3" or "han4 zi4"
+    speech: str   # text handed to TTS for this reading
+    default: bool
+
+    def audio_stem(self, text: str) -> str:
+        """File stem of this reading's audio: "了" for the default, "了_liao3" otherwise."""
+        return text if self.default else f"{text}_{self.pinyin.replace(' ', '_')}"
+
+
+@dataclass(frozen=True)
+class Pronunciation:
+    text: str
+    readings: List[Reading]  # default first
+
+    @property
+    def default(self) -> str:
+        return self.readings[0].pinyin
+
+
+class PinyinResolver:
+    """Memoizing wrapper around pypinyin for whole character lists."""
+
+    def __init__(self, heteronym: bool = True):
+        self.heteronym = heteronym
+        self._memo: Dict[str, Pronunciation] = {}
+
+    def resolve(self, texts: Iterable[str]) -> Dict[str, Pronunciation]:
+        texts = list(dict.fromkeys(texts))
+        missing = [text for text in texts if text not in self._memo]
+        uses = phrase_readings({text for text in missing if len(text) == 1}) \
+            if self.heteronym else Counter()
+        for text in missing:
+            syllables = pinyin(text, style=Style.TONE3, heteronym=self.heteronym)
+            self._memo[text] = self._pronunciation(text, syllables, uses)
+        return {text: self._memo[text] for text in texts}
+
+    def _pronunciation(self, text: str, syllables: List[List[str]],
+                       uses: Counter) -> Pronunciation:
+        default = " ".join(options[0] for options in syllables)
+        readings = [Reading(default, text, True)]
+        if len(syllables) == 1:
+            readings += [Reading(option, to_tone(option), False)
+                         for option in dict.fromkeys(syllables[0][1:])
+                         if option != default and uses[text, option] >= MIN_PHRASES
+                         and not (text in TONE_SANDHI and option[:-1] == default[:-1])]
+        return Pronunciation(text, readings)
+
+
+def phrase_readings(chars: set) -> Counter:
+    """Count the words in pypinyin's phrase dictionary using each (char, reading)."""
+    uses = Counter()
+    if not chars:
+        return uses
+    for phrase, syllables in PHRASES_DICT.items():
+        if len(phrase) == len(syllables) and not chars.isdisjoint(phrase):
+            for char, options in zip(phrase, syllables):
+                if char in chars:
+                    uses[char, to_tone3(options[0])] += 1
+    return uses
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(
+        description="Benchmark memoized pinyin resolution against plain pypinyin calls.")
+    ap.add_argument("--db", default="data",
+                    help="Directory containing pinyin_database.json (the character corpus)")
+    ap.add_argument("strings", nargs="*",
+                    help="Entries to resolve instead of the database")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    texts = args.strings
+    if not texts:
+        with open(os.path.join(args.db, "pinyin_database.json"), encoding="utf-8") as f:
+            texts = [row["hanzi"] for row in json.load(f)]
+
+    start = time.perf_counter()
+    for text in texts:
+        pinyin(text, style=Style.TONE3)[0][0]
+    per_call = time.perf_counter() - start
+
+    resolver = PinyinResolver()
+    start = time.perf_counter()
+    resolved = resolver.resolve(texts)
+    batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    resolver.resolve(texts)
+    memo = time.perf_counter() - start
+
+    polyphonic = [p for p in resolved.values() if len(p.readings) > 1]
+    print(f"{len(texts)} entries, {len(polyphonic)} with several readings, "
+          f"{sum(len(p.readings) for p in resolved.values())} readings in total")
+    print(f"per-character calls {per_call * 1e3:8.2f} ms  (default reading only)")
+    print(f"resolve             {batch * 1e3:8.2f} ms  (all readings)")
+    print(f"memoized resolve    {memo * 1e3:8.2f} ms")
+    for p in polyphonic[:10]:
+        print(f"  {p.text}: " + " / ".join(r.pinyin for r in p.readings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# sprite_atlas.py
+"""
+Pack many small glyph images into power-of-two sprite sheets.
+
+Sprites are placed on shelves (rows), tallest first, in sheets no larger
+than `max_size`; each sheet is then cropped to the smallest power-of-two
+width and height that still holds everything placed on it. A JSON index next
+to the sheets maps each string to its sheet, pixel rectangle and UV
+rectangle. UVs use a bottom-left origin (Unity / OpenGL convention):
+[u_min, v_min, u_max, v_max].
+"""
+
+import json
+import math
+import os
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+from PIL import Image
+
+Placement = Tuple[int, int, int]  # sheet, x, y
+
+
+def next_pow2(n: int) -> int:
+    return 1 << max(0, math.ceil(math.log2(max(n, 1))))
+
+
+def pack_shelves(sizes: Sequence[Tuple[int, int]], max_size: int = 4096,
+                 gutter: int = 1) -> Tuple[List[Placement], List[Tuple[int, int]]]:
+    """Shelf-pack (width, height) boxes.
+
+    Returns one (sheet, x, y) per box, in input order, and the power-of-two
+    (width, height) of every sheet.
+    """
+    if any(w + gutter > max_size or h + gutter > max_size for w, h in sizes):
+        raise ValueError(f"sprite larger than the {max_size}px sheet size")
+    # Aim for roughly square sheets rather than one very wide strip
+    area = sum((w + gutter) * (h + gutter) for w, h in sizes)
+    widest = max((w + gutter for w, _ in sizes), default=1)
+    sheet_width = min(max_size, max(next_pow2(math.ceil(math.sqrt(area))), next_pow2(widest)))
+
+    placements: List[Placement] = [None] * len(sizes)
+    extents: List[List[int]] = [[0, 0]]
+    sheet = x = y = shelf_height = 0
+    for i in sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0])):
+        w, h = sizes[i][0] + gutter, sizes[i][1] + gutter
+        if x + w > sheet_width:  # next shelf
+            x, y, shelf_height = 0, y + shelf_height, 0
+        if y + h > max_size:  # next sheet
+            sheet, x, y, shelf_height = sheet + 1, 0, 0, 0
+            extents.append([0, 0])
+        placements[i] = (sheet, x, y)
+        x += w
+        shelf_height = max(shelf_height, h)
+        extents[sheet][0] = max(extents[sheet][0], x)
+        extents[sheet][1] = max(extents[sheet][1], y + h)
+    return placements, [(next_pow2(w), next_pow2(h)) for w, h in extents]
+
+
+def write_sprite_atlas(images: Mapping[str, Image.Image], atlas_path: str,
+                       max_size: int = 4096, gutter: int = 1, background=(0, 0, 0, 0),
+                       index_path: str = None) -> Dict[str, dict]:
+    """Write `images` into `<atlas>_0.png`, `<atlas>_1.png`, ... plus a JSON index.
+
+    Returns the index that is also written to `index_path`
+    (default: the atlas path with a .json extension).
+    """
+    stem = os.path.splitext(atlas_path)[0]
+    index_path = index_path or stem + ".json"
+    texts = list(images)
+    placements, sheet_sizes = pack_shelves([images[t].size for t in texts], max_size, gutter)
+    mode = next(iter(images.values())).mode if images else "RGBA"
+
+    sheets = [Image.new(mode, size, background) for size in sheet_sizes]
+    sheet_names = [f"{os.path.basename(stem)}_{i}.png" for i in range(len(sheets))]
+    glyphs = {}
+    for text, (sheet, x, y) in zip(texts, placements):
+        img = images[text]
+        w, h = img.size
+        sheets[sheet].paste(img, (x, y))
+        sw, sh = sheet_sizes[sheet]
+        glyphs[text] = {
+            "sheet": sheet,
+            "x": x, "y": y, "w": w, "h": h,
+            "uv": [x / sw, 1 - (y + h) / sh, (x + w) / sw, 1 - y / sh],
+        }
+
+    os.makedirs(os.path.dirname(atlas_path) or ".", exist_ok=True)
+    for img, name in zip(sheets, sheet_names):
+        img.save(os.path.join(os.path.dirname(atlas_path), name), format="PNG", optimize=True)
+    index = {
+        "sheets": [{"file": name, "width": w, "height": h}
+                   for name, (w, h) in zip(sheet_names, sheet_sizes)],
+        "glyphs": glyphs,
+    }
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    return index
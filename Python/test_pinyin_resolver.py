@@ -0,0 +1,27 @@
+# test_pinyin_resolver.py
+from pinyin_resolver import PinyinResolver
+
+
+def test_mixed_entries_do_not_shift_later_readings():
+    resolved = PinyinResolver().resolve(["AB", "中", "乐", "卡拉OK", "你"])
+    assert resolved["AB"].default == "AB"
+    assert resolved["中"].default == "zhong1"
+    assert resolved["乐"].default == "le4"
+    assert resolved["卡拉OK"].default == "ka3 la1 OK"
+    assert resolved["你"].default == "ni3"
+
+
+def test_heteronyms_and_memo():
+    resolver = PinyinResolver()
+    first = resolver.resolve(["了"])["了"]
+    assert first.readings[0].default and first.readings[0].speech == "了"
+    assert any(not r.default and r.speech == "liǎo" for r in first.readings)
+    assert resolver.resolve(["了"])["了"] is first
+
+
+def test_sandhi_and_rare_readings_are_dropped():
+    resolved = PinyinResolver().resolve(["一", "不", "那", "长"])
+    assert [r.pinyin for r in resolved["一"].readings] == ["yi1"]
+    assert [r.pinyin for r in resolved["不"].readings] == ["bu4"]
+    assert [r.pinyin for r in resolved["那"].readings] == ["na4"]
+    assert [r.pinyin for r in resolved["长"].readings] == ["zhang3", "chang2"]
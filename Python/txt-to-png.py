@@ -17,35 +17,88 @@ python render_hanzi_png.py \
 # 2) Directly from CLI strings
 python render_hanzi_png.py \
     --font myfont.ttf "你好" "世界"
+
+# 3) Across 8 worker processes, packed into power-of-two sprite sheets
+#    (atlas/hanzi_0.png, atlas/hanzi_1.png, ... plus atlas/hanzi.json UVs)
+python render_hanzi_png.py \
+    --font NotoSansCJKsc-Regular.otf --bg transparent \
+    --jobs 8 --atlas atlas/hanzi.png --file hanzi_list.txt
+
+# 4) 32px signed distance fields (single channel, crisp at any scale)
+python render_hanzi_png.py \
+    --font NotoSansCJKsc-Regular.otf --sdf --sdf-size 32 --sdf-spread 4 \
+    --atlas atlas/hanzi_sdf.png --file hanzi_list.txt
+
+# 5) Large batch: JSON-lines events per string, failures in pngs/failed.json
+python render_hanzi_png.py \
+    --font NotoSansCJKsc-Regular.otf --jobs 8 --quiet \
+    --events pngs/events.jsonl --outdir pngs --file hanzi_list.txt
 """
 
 import argparse
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from PIL import Image, ImageDraw, ImageFont
 
+from build_events import EventLog
+from glyph_outlines import get_outlines
+from glyph_sdf import DEFAULT_SDF_SIZE, DEFAULT_SPREAD, render_sdf
+from sprite_atlas import write_sprite_atlas
 
-def render_text(text: str,
-                font: ImageFont.FreeTypeFont,
-                padding: int,
-                fg: str,
-                bg: str,
-                out_path: Path):
-    """Render a single string and save as PNG."""
-    # Measure text
-    dummy_img = Image.new("RGB", (1, 1))
-    draw = ImageDraw.Draw(dummy_img)
-    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
-    width, height = right - left, bottom - top
+_font = None  # per-process font, set by _init_worker
+_sdf = None   # (outlines, size, spread) in --sdf mode
 
+
+def background(bg: str):
+    """Image mode and fill colour for a --bg value."""
     mode = "RGBA" if (bg.lower() == "transparent" or len(bg) in (8, 9)) else "RGB"
-    img  = Image.new(mode, (width + 2 * padding, height + 2 * padding),
-                    color=(0, 0, 0, 0) if bg.lower() == "transparent" else bg)
+    return mode, (0, 0, 0, 0) if bg.lower() == "transparent" else bg
+
+
+def render_image(text: str,
+                 font: ImageFont.FreeTypeFont,
+                 padding: int,
+                 fg: str,
+                 bg: str) -> Image.Image:
+    """Render a single string to an image sized to its bounding box."""
+    # Measure text straight from the font, no scratch image needed
+    left, top, right, bottom = font.getbbox(text)
+    width, height = right - left, bottom - top
+
+    mode, fill = background(bg)
+    img  = Image.new(mode, (width + 2 * padding, height + 2 * padding), color=fill)
     draw = ImageDraw.Draw(img)
     draw.text((padding - left, padding - top), text, font=font, fill=fg)
-    img.save(out_path, format="PNG")
-    print(f"✓ {out_path.name}")
+    return img
+
+
+def _init_worker(font_path: str, fontsize: int, sdf=None):
+    # Each worker process opens the font exactly once
+    global _font, _sdf
+    if sdf:
+        _sdf = (get_outlines(font_path), *sdf)
+    else:
+        _font = ImageFont.truetype(font_path, fontsize)
+
+
+def _render_job(job):
+    """Worker: (text, image or None, seconds, bytes written, error or None)."""
+    text, padding, fg, bg, out_path = job
+    start = time.perf_counter()
+    try:
+        if _sdf:
+            img = render_sdf(text, *_sdf)
+        else:
+            img = render_image(text, _font, padding, fg, bg)
+        if out_path is None:
+            return text, img, time.perf_counter() - start, None, None
+        img.save(out_path, format="PNG")
+        return text, None, time.perf_counter() - start, os.path.getsize(out_path), None
+    except Exception as e:
+        return text, None, time.perf_counter() - start, None, f"{type(e).__name__}: {e}"
 
 
 def parse_args():
@@ -63,10 +116,28 @@ def parse_args():
                     help="Text colour (CSS hex)")
     ap.add_argument("--outdir", default="out_png",
                     help="Directory for generated PNGs")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="Worker processes for rendering (default 1 = in-process)")
+    ap.add_argument("--atlas",
+                    help="Pack everything into power-of-two sheets at this path "
+                         "(e.g. atlas/hanzi.png) with a JSON UV index instead of one PNG per string")
+    ap.add_argument("--atlas-size", type=int, default=4096,
+                    help="Maximum atlas sheet width/height in pixels (default 4096)")
+    ap.add_argument("--sdf", action="store_true",
+                    help="Write single-channel signed distance fields instead of raster "
+                         "glyphs (--fontsize/--padding/--fg/--bg are ignored)")
+    ap.add_argument("--sdf-size", type=int, default=DEFAULT_SDF_SIZE,
+                    help=f"SDF em size in pixels (default {DEFAULT_SDF_SIZE})")
+    ap.add_argument("--sdf-spread", type=float, default=DEFAULT_SPREAD,
+                    help=f"Distance in pixels spanned by the 0..255 range (default {DEFAULT_SPREAD:g})")
+    ap.add_argument("--events", metavar="PATH",
+                    help="Append one JSON line per rendered string to PATH")
+    ap.add_argument("--quiet", action="store_true",
+                    help="Only print failures and the summary")
     group = ap.add_mutually_exclusive_group(required=True)
     group.add_argument("--file",
                        help="UTF-8 text file, one string per line")
-    group.add_argument("strings", nargs="*",
+    group.add_argument("strings", nargs="*", default=[],
                        help="Strings given directly on the CLI")
     return ap.parse_args()
 
@@ -74,8 +145,6 @@ def parse_args():
 def main():
     args = parse_args()
 
-    font = ImageFont.truetype(args.font, args.fontsize)
-
     outdir = Path(args.outdir)
     outdir.mkdir(parents=True, exist_ok=True)
 
@@ -85,11 +154,53 @@ def main():
     else:
         items = args.strings
 
+    jobs = []
     for text in items:
         safe_name = "_".join(f"{ord(c):X}" for c in text)
-        out_path = outdir / f"{safe_name}.png"
-        render_text(text, font, args.padding,
-                    fg=args.fg, bg=args.bg, out_path=out_path)
+        out_path = None if args.atlas else outdir / f"{safe_name}.png"
+        jobs.append((text, args.padding, args.fg, args.bg, out_path))
+
+    sdf = (args.sdf_size, args.sdf_spread) if args.sdf else None
+    start = time.perf_counter()
+    if args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker,
+                                 initargs=(args.font, args.fontsize, sdf)) as pool:
+            results = list(pool.map(_render_job, jobs,
+                                    chunksize=max(1, len(jobs) // (args.jobs * 4))))
+    else:
+        _init_worker(args.font, args.fontsize, sdf)
+        results = [_render_job(job) for job in jobs]
+
+    stage = "sdf" if args.sdf else "png"
+    images = {}
+    with EventLog(args.events, echo=not args.quiet) as log:
+        for (text, img, seconds, written, error), (*_, out_path) in zip(results, jobs):
+            if error:
+                log.emit(stage, text, "failed", seconds, error)
+                continue
+            log.emit(stage, text, "ok", seconds, bytes=written,
+                     file=out_path.name if out_path else None)
+            if img is not None:
+                images[text] = img
+        if args.atlas and images:
+            atlas_start = time.perf_counter()
+            index = write_sprite_atlas(images, args.atlas, max_size=args.atlas_size,
+                                       background=0 if args.sdf else background(args.bg)[1])
+            log.emit("atlas", "*", "ok", time.perf_counter() - atlas_start,
+                     bytes=sum(os.path.getsize(Path(args.atlas).parent / s["file"])
+                               for s in index["sheets"]),
+                     strings=len(index["glyphs"]), sheets=len(index["sheets"]))
+            print(f"✓ {len(index['glyphs'])} strings in {len(index['sheets'])} sheet(s): "
+                  + ", ".join(f"{s['file']} {s['width']}x{s['height']}" for s in index["sheets"]))
+
+    print(f"Rendered {len(jobs) - len(log.failures)} of "
+          f"{len(jobs)} strings in {time.perf_counter() - start:.2f}s "
+          f"({args.jobs} job{'s' if args.jobs != 1 else ''})")
+    print(log.report())
+    if log.failures:
+        failures_path = outdir / "failed.json"
+        log.write_failures(failures_path)
+        print(f"❌ {len(log.failures)} failed, see {failures_path}: {' '.join(log.retry_list())}")
 
 
 if __name__ == "__main__":